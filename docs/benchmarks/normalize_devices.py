@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Apache License v2.0+ (see LICENSE or https://www.apache.org/licenses/LICENSE-2.0)
+
+"""Benchmark device normalization for gather: the per-device json round trip through the cdo_models dataclasses
+(what normalize_device_output did up to 1.1.x) against the precomputed DEVICE_FIELDS tables it uses now.
+
+Run from a directory where the collection is importable, e.g. with the collection installed or with
+PYTHONPATH set to the directory that holds ansible_collections/cisco/cdo:
+
+    python docs/benchmarks/normalize_devices.py --devices 10000 --repeat 3
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import time
+from dataclasses import fields
+from ansible_collections.cisco.cdo.plugins.module_utils.cdo_models import ASA_IOS, FTD, FMC
+from ansible_collections.cisco.cdo.plugins.module_utils.query import INVENTORY_FIELDS
+from ansible_collections.cisco.cdo.plugins.modules.device_inventory import normalize_device_output
+
+DEVICE_TYPES = ["ASA", "IOS", "FTDC", "FMCE"]
+# A value of the declared type for every model field, so that the dataclasses decode every record without warnings
+FIELD_TYPES = {field.name: field.type for model in (ASA_IOS, FTD, FMC) for field in fields(model)}
+SAMPLE_VALUES = {"dict": {"site": ["site-1"]}, "list": ["site"], "bool": True}
+
+
+def synthetic_devices(count: int) -> list:
+    """Return count devices of mixed types with every inventory attribute set, as a full gather resolves them"""
+    devices = list()
+    for i in range(count):
+        device = {field: f"{field}-{i}" for field in INVENTORY_FIELDS}
+        for field, field_type in FIELD_TYPES.items():
+            field_type = getattr(field_type, "__name__", field_type)
+            device[field] = SAMPLE_VALUES.get(field_type, f"{field}-{i}")
+        device.update({"uid": f"uid-{i}", "name": f"device-{i}", "deviceType": DEVICE_TYPES[i % len(DEVICE_TYPES)]})
+        devices.append(device)
+    return devices
+
+
+def json_round_trip(devices: list) -> list:
+    """The previous normalization: one dataclass per device, built from and dumped back to JSON"""
+    models = {"ASA": ASA_IOS, "IOS": ASA_IOS, "FTDC": FTD, "FMCE": FMC}
+    return [models[device["deviceType"]].from_json(json.dumps(device)).to_dict() for device in devices]
+
+
+def best_of(repeat: int, fn, devices: list) -> tuple:
+    """Return the fastest of repeat runs in milliseconds and the output of the last run"""
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn(devices)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=10000, help="number of synthetic devices")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per method, the fastest is reported")
+    args = parser.parse_args()
+
+    devices = synthetic_devices(args.devices)
+    round_trip_ms, expected = best_of(args.repeat, json_round_trip, devices)
+    tables_ms, output = best_of(args.repeat, normalize_device_output, devices)
+    print(f"{args.devices} devices, best of {args.repeat}")
+    print(f"  json round trip: {round_trip_ms:8.0f} ms")
+    print(f"  field tables:    {tables_ms:8.0f} ms")
+    print(f"  identical output: {output == expected}")
+
+
+if __name__ == "__main__":
+    main()
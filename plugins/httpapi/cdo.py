@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Apache License v2.0+ (see LICENSE or https://www.apache.org/licenses/LICENSE-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+name: cdo
+short_description: HttpApi plugin that keeps Cisco Defense Orchestrator (CDO) API sessions open across tasks
+description: >-
+  This plugin runs inside the persistent ansible.netcommon.httpapi connection and keeps one authenticated,
+  keep-alive HTTPS session per CDO tenant (API token) and region for the life of the play. When a cisco.cdo
+  module runs over this connection, its API calls are sent through the shared session instead of opening a new
+  TLS connection for every task.
+author: Aaron Hackney (@aaronhackney)
+version_added: "1.2.0"
+"""
+
+EXAMPLES = r"""
+# inventory.yml
+all:
+  vars:
+    ansible_connection: ansible.netcommon.httpapi
+    ansible_network_os: cisco.cdo.cdo
+    ansible_host: www.defenseorchestrator.com
+"""
+
+import hashlib
+import urllib.parse
+import requests
+from ansible.plugins.httpapi import HttpApiBase
+
+
+class HttpApi(HttpApiBase):
+    """Hold the CDO requests sessions in the persistent connection process"""
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self.sessions = dict()
+
+    def get_session(self, url: str, headers: dict) -> requests.Session:
+        """Return the keep-alive session for the tenant (API token) and region (CDO host) of this call"""
+        token = hashlib.sha256(headers.get("Authorization", "").encode("utf-8")).hexdigest()
+        key = (urllib.parse.urlsplit(url).netloc, token)
+        if key not in self.sessions:
+            self.sessions[key] = requests.Session()
+        return self.sessions[key]
+
+    def cdo_request(self, method: str, url: str, headers: dict = None, params: dict = None, data: dict = None) -> dict:
+        """Send the API call over the shared session and return the parts of the response the module needs"""
+        headers = headers or dict()
+        response = self.get_session(url, headers).request(method, url, headers=headers, params=params, json=data)
+        return {
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "url": response.url,
+            "headers": dict(response.headers),
+            "text": response.text,
+        }
+
+    def send_request(self, data, **message_kwargs):
+        """Generic entry point used by the httpapi connection, see cdo_request"""
+        return self.cdo_request(
+            message_kwargs.get("method", "GET"),
+            message_kwargs.get("url"),
+            headers=message_kwargs.get("headers"),
+            params=message_kwargs.get("params"),
+            data=data,
+        )
+
+    def logout(self):
+        """Close every pooled connection when the persistent connection shuts down"""
+        for session in self.sessions.values():
+            session.close()
+        self.sessions = dict()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# Apache License v2.0+ (see LICENSE or https://www.apache.org/licenses/LICENSE-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+name: cdo
+short_description: Cisco Defense Orchestrator (CDO) device inventory source
+description: >-
+  Build an Ansible inventory from the devices (ASA, IOS, FTD, FMC) in a Cisco Defense Orchestrator (CDO) tenant. The
+  whole tenant is paged through the CDO devices API and hosts are grouped by device type, CDO tags, and the Secure
+  Device Connector (larUid) they use. Supports Ansible inventory cache plugins so large tenants are only loaded once
+  per cache period. The configuration file name must end with cdo.yml or cdo.yaml.
+author: Aaron Hackney (@aaronhackney)
+version_added: "1.2.0"
+requirements:
+  - requests
+extends_documentation_fragment:
+  - constructed
+  - inventory_cache
+options:
+  plugin:
+    description: The name of this plugin, it should always be set to cisco.cdo.cdo for this plugin to recognize it.
+    type: str
+    required: true
+    choices:
+      - cisco.cdo.cdo
+  api_key:
+    description: This is the CDO tenant's API token.
+    type: str
+    required: true
+    env:
+      - name: CDO_API_KEY
+  region:
+    description: This is the CDO region where the tenant exists.
+    type: str
+    choices:
+      - us
+      - eu
+      - apj
+    default: us
+    env:
+      - name: CDO_REGION
+  device_type:
+    description: The types of devices to add to the inventory
+    type: str
+    choices:
+      - all
+      - asa
+      - ios
+      - ftd
+      - fmc
+    default: all
+  filter:
+    description: Only add devices whose name, ipv4 address, or serial number match this filter
+    type: str
+  page_size:
+    description: The number of devices to request per API call
+    type: int
+    default: 50
+  workers:
+    description: When greater than 1, request this many pages of devices at once
+    type: int
+    default: 1
+  group_by:
+    description: >-
+      Which device attributes to build groups from. C(device_type) adds groups such as C(asa) and C(ftd), C(tags)
+      adds C(tag_<key>_<value>) groups and C(lar) adds a C(lar_<larUid>) group per Secure Device Connector.
+    type: list
+    elements: str
+    choices:
+      - device_type
+      - tags
+      - lar
+    default:
+      - device_type
+      - tags
+      - lar
+"""
+
+EXAMPLES = r"""
+# cdo.yml
+plugin: cisco.cdo.cdo
+region: us
+device_type: all
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.ansible/cdo_inventory_cache
+cache_timeout: 3600
+keyed_groups:
+  - key: cdo_device.softwareVersion
+    prefix: version
+"""
+
+from ansible.errors import AnsibleError
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
+from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORegions, CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils._version import __version__
+from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import APIError, CredentialsFailure
+
+# CDO deviceType to the device_type names used by the modules and sample inventory
+DEVICE_TYPES = {"ASA": "asa", "IOS": "ios", "FTDC": "ftd", "FMC_MANAGED_DEVICE": "ftd", "FMC": "fmc", "FMCE": "fmc"}
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    NAME = "cisco.cdo.cdo"
+
+    def verify_file(self, path):
+        """Only claim configuration files named for this plugin"""
+        return super(InventoryModule, self).verify_file(path) and path.endswith(("cdo.yml", "cdo.yaml"))
+
+    def get_devices(self) -> list:
+        """Page through the CDO tenant and return every device matching the configured device_type and filter"""
+        http_session = CDORequests.create_session(self.get_option("api_key"), __version__)
+        endpoint = CDORegions[self.get_option("region")].value
+        for option in ("page_size", "workers"):
+            if self.get_option(option) < 1:
+                raise AnsibleError(f"{option} must be 1 or more, got {self.get_option(option)}")
+        inventory_client = Inventory(
+            {"device_type": self.get_option("device_type"), "filter": self.get_option("filter")}, http_session, endpoint
+        )
+        try:
+            return inventory_client.gather_inventory(self.get_option("page_size"), self.get_option("workers"))
+        except (APIError, CredentialsFailure) as e:
+            raise AnsibleError(f"Failed to get the CDO inventory: {e.message}")
+
+    def add_device(self, device: dict):
+        """Add the device as a host, set its host vars and put it in the configured groups"""
+        hostname = self.inventory.add_host(device.get("name"))
+        device_type = DEVICE_TYPES.get(device.get("deviceType"), str(device.get("deviceType")).lower())
+        ipv4, _sep, mgmt_port = (device.get("ipv4") or "").partition(":")
+        host_vars = {"cdo_device": device, "device_type": device_type}
+        if ipv4:
+            host_vars.update({"ansible_host": ipv4, "ipv4": ipv4})
+        if mgmt_port:
+            host_vars["mgmt_port"] = int(mgmt_port)
+        for key, value in host_vars.items():
+            self.inventory.set_variable(hostname, key, value)
+
+        group_by = self.get_option("group_by")
+        groups = list()
+        if "device_type" in group_by:
+            groups.append(device_type)
+        if "tags" in group_by:
+            for tag_key, tag_values in (device.get("tags") or {}).items():
+                for tag_value in tag_values if isinstance(tag_values, list) else [tag_values]:
+                    groups.append(f"tag_{tag_key}_{tag_value}")
+        if "lar" in group_by and device.get("larUid"):
+            groups.append(f"lar_{device.get('larUid')}")
+        for group in groups:
+            group = self.inventory.add_group(self._sanitize_group_name(group))
+            self.inventory.add_child(group, hostname)
+
+        strict = self.get_option("strict")
+        self._set_composite_vars(self.get_option("compose"), host_vars, hostname, strict=strict)
+        self._add_host_to_composed_groups(self.get_option("groups"), host_vars, hostname, strict=strict)
+        self._add_host_to_keyed_groups(self.get_option("keyed_groups"), host_vars, hostname, strict=strict)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option("cache") and cache
+        update_cache = self.get_option("cache") and not cache
+        devices = None
+        if use_cache:
+            try:
+                devices = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if devices is None:
+            devices = self.get_devices()
+        if update_cache:
+            self._cache[cache_key] = devices
+
+        for device in devices:
+            if device.get("name"):
+                self.add_device(device)
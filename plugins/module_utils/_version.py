@@ -5,4 +5,4 @@
 from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
-__version__ = "1.1.6"
+__version__ = "1.2.0"
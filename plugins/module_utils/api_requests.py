@@ -6,9 +6,20 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import asyncio
+import inspect
+import random
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from enum import Enum
 from functools import wraps
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from ansible.module_utils.connection import Connection, ConnectionError as AnsibleConnectionError
 from .errors import DuplicateObject, APIError, DeviceNotFound, CredentialsFailure
 
 
@@ -20,38 +31,169 @@ class CDORegions(Enum):
     apj = "apj.cdo.cisco.com"
 
 
+class CDORetryPolicy:
+    """Retry and back-off settings for the API calls made through CDORequests. The policy lives on the http session
+    and keeps a running count of retries and time spent backing off so the module can report them."""
+
+    RETRY_STATUS_CODES = [429, 502, 503, 504]
+    IDEMPOTENT_METHODS = ["GET", "PUT", "DELETE"]
+
+    def __init__(self, retries: int = 5, backoff_factor: float = 0.5, backoff_max: float = 30):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_count = 0
+        self.backoff_time = 0.0
+        self.lock = threading.Lock()
+
+    def is_retryable(self, method: str, status_code: int = None) -> bool:
+        """A 429 means CDO throttled the call before processing it, so any verb may be resent. Other transient
+        failures (5xx gateway errors, dropped connections) are only retried for idempotent verbs."""
+        if status_code == 429:
+            return True
+        if method not in self.IDEMPOTENT_METHODS:
+            return False
+        return status_code is None or status_code in self.RETRY_STATUS_CODES
+
+    def get_retry_after(self, response: requests.Response) -> float | None:
+        """Return the number of seconds the server asked us to wait, if any (Retry-After is seconds or an HTTP date)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if not retry_after:
+            return
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0)
+            except (TypeError, ValueError):
+                return
+
+    def get_backoff(self, attempt: int, response: requests.Response = None) -> float:
+        """Honour Retry-After when the server sends it, else exponential back-off with full jitter"""
+        retry_after = self.get_retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2**attempt)))
+
+    def backoff(self, attempt: int, response: requests.Response = None):
+        """Sleep before the next attempt and record it"""
+        delay = self.get_backoff(attempt, response)
+        with self.lock:
+            self.retry_count += 1
+            self.backoff_time += delay
+        sleep(delay)
+
+    def stats(self) -> dict:
+        """Return the retry counters for the module result"""
+        return {"retries": self.retry_count, "backoff_seconds": round(self.backoff_time, 3)}
+
+
 class CDOAPIWrapper(object):
     """This decorator class wraps all API methods of ths client and solves a number of issues. For example, if an
     object already exists when attempting to create an object, raise the custom error 'CDODuplicateDevice' and give
     the consumer the opportunity to ignore the error and carry on with other operations in their script.
+    Throttled (429) and transient (5xx, dropped connection) calls are retried according to the CDORetryPolicy
+    attached to the http session, if any.
     Note that the response from the API calls are a tuple. Example:
     """
 
+    def __init__(self, method: str = "GET"):
+        self.method = method
+
     # Add handler for bad certificate
     def __call__(self, fn):
         @wraps(fn)
         def new_func(*args, **kwargs):
-            try:
-                return fn(*args, **kwargs)
-            except requests.HTTPError as ex:
-                if ex.response.status_code == 404:
-                    raise DeviceNotFound("404 Device Not Found")
-                elif ex.response.status_code == 401:
-                    raise CredentialsFailure("API Key was rejected by CDO API")
-                elif ex.response.status_code in range(400, 600):
-                    if "Duplicate" in ex.response.text:
-                        raise DuplicateObject(ex.response.text)
-                    else:
-                        raise APIError(ex)
+            http_session = args[0] if args else kwargs.get("http_session")
+            retry_policy = getattr(http_session, "retry_policy", None)
+            attempt = 0
+            while True:
+                try:
+                    return fn(*args, **kwargs)
+                except requests.HTTPError as ex:
+                    if (
+                        retry_policy is not None
+                        and attempt < retry_policy.retries
+                        and retry_policy.is_retryable(self.method, ex.response.status_code)
+                    ):
+                        retry_policy.backoff(attempt, ex.response)
+                        attempt += 1
+                        continue
+                    if ex.response.status_code == 404:
+                        raise DeviceNotFound("404 Device Not Found")
+                    elif ex.response.status_code == 401:
+                        raise CredentialsFailure("API Key was rejected by CDO API")
+                    elif ex.response.status_code in range(400, 600):
+                        if "Duplicate" in ex.response.text:
+                            raise DuplicateObject(ex.response.text)
+                        else:
+                            raise APIError(ex)
+                except (requests.ConnectionError, requests.Timeout):
+                    if (
+                        retry_policy is not None
+                        and attempt < retry_policy.retries
+                        and retry_policy.is_retryable(self.method)
+                    ):
+                        retry_policy.backoff(attempt)
+                        attempt += 1
+                        continue
+                    raise
 
         return new_func
 
 
+class CDOConnectionSession:
+    """Stand-in for requests.Session that sends every API call through the persistent cisco.cdo httpapi connection,
+    so the TLS session and connection pool are reused across tasks instead of being rebuilt for every module run"""
+
+    def __init__(self, socket_path: str):
+        self.connection = Connection(socket_path)
+        self.headers = dict()
+
+    def request(self, method: str, url: str, headers: dict = None, params: dict = None, json: dict = None):
+        """Send the call to the connection plugin and rebuild a requests.Response from its reply"""
+        try:
+            reply = self.connection.cdo_request(
+                method, url, headers={**self.headers, **(headers or {})}, params=params, data=json
+            )
+        except AnsibleConnectionError as e:
+            raise requests.ConnectionError(str(e))
+        response = requests.Response()
+        response.status_code = reply["status_code"]
+        response.reason = reply["reason"]
+        response.url = reply["url"]
+        response.headers = CaseInsensitiveDict(reply["headers"])
+        response.encoding = "utf-8"
+        response._content = reply["text"].encode("utf-8")
+        return response
+
+    def get(self, url: str, headers: dict = None, params: dict = None):
+        return self.request("GET", url, headers=headers, params=params)
+
+    def post(self, url: str, headers: dict = None, params: dict = None, json: dict = None):
+        return self.request("POST", url, headers=headers, params=params, json=json)
+
+    def put(self, url: str, headers: dict = None, params: dict = None, json: dict = None):
+        return self.request("PUT", url, headers=headers, params=params, json=json)
+
+    def delete(self, url: str, headers: dict = None):
+        return self.request("DELETE", url, headers=headers)
+
+
 class CDORequests:
+    POOL_MAXSIZE = 50  # Keep-alive connections per host, sized for CDOAsyncRequests fan-out
+
     @staticmethod
-    def create_session(token: str, version: str) -> str:
-        """Helper function to set the auth token and accept headers in the API request"""
-        http_session = requests.Session()
+    def create_session(token: str, version: str, socket_path: str = None, retry: dict = None) -> str:
+        """Helper function to set the auth token and accept headers in the API request. If the module is running over
+        the persistent cisco.cdo httpapi connection (socket_path), route the API calls through it. The retry dict
+        (see api_retry in args_common.py) configures the CDORetryPolicy attached to the session"""
+        if socket_path is None:
+            http_session = requests.Session()
+            http_session.mount("https://", HTTPAdapter(pool_maxsize=CDORequests.POOL_MAXSIZE))
+        else:
+            http_session = CDOConnectionSession(socket_path)
+        http_session.retry_policy = CDORetryPolicy(**(retry or {}))
         http_session.headers = {
             "Authorization": f"Bearer {token.strip()}",
             "Accept": "*/*",
@@ -60,7 +202,7 @@ class CDORequests:
         }
         return http_session
 
-    @CDOAPIWrapper()
+    @CDOAPIWrapper("GET")
     @staticmethod
     def get(http_session: requests.Session, url: str, path: str = None, query: dict = None):
         """Given the CDO endpoint, path, and query, return the json payload from the API"""
@@ -78,7 +220,7 @@ class CDORequests:
         # else:
         #     return result.text
 
-    @CDOAPIWrapper()
+    @CDOAPIWrapper("POST")
     @staticmethod
     def post(http_session: requests.Session, url: str, path: str = None, data: dict = None, query: dict = None) -> str:
         """Given the CDO endpoint, path, and query, post the json data and return the json payload from the API"""
@@ -90,7 +232,7 @@ class CDORequests:
         else:
             return
 
-    @CDOAPIWrapper()
+    @CDOAPIWrapper("PUT")
     @staticmethod
     def put(http_session: requests.Session, url: str, path: str = None, data: dict = None, query: dict = None) -> str:
         """Given the CDO endpoint, path, and query, return the json payload from the API"""
@@ -102,9 +244,66 @@ class CDORequests:
         else:
             return
 
-    @CDOAPIWrapper()
+    @CDOAPIWrapper("DELETE")
     @staticmethod
     def delete(http_session: requests.Session, url: str, path: str = None) -> int:
         result = http_session.delete(url=f"{url}/{path}", headers=http_session.headers)
         result.raise_for_status()
         return result.status_code
+
+
+class CDOAsyncRequests:
+    """asyncio counterpart of CDORequests for issuing many API calls at once from one module run. Each call runs the
+    blocking CDORequests method in a worker thread, so the error mapping (CDOAPIWrapper) and retry policy are the same.
+    Example:
+        results = CDOAsyncRequests.run(
+            [CDOAsyncRequests.get(http_session, url, path=f"{CDOAPI.DEVICES.value}/{uid}") for uid in uids],
+            concurrency=20,
+        )
+    """
+
+    @staticmethod
+    async def call(fn, *args, **kwargs):
+        """Run any blocking function (e.g. a whole onboarding workflow) in a worker thread"""
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    @staticmethod
+    async def get(http_session: requests.Session, url: str, path: str = None, query: dict = None):
+        return await CDOAsyncRequests.call(CDORequests.get, http_session, url, path=path, query=query)
+
+    @staticmethod
+    async def post(http_session: requests.Session, url: str, path: str = None, data: dict = None, query: dict = None):
+        return await CDOAsyncRequests.call(CDORequests.post, http_session, url, path=path, data=data, query=query)
+
+    @staticmethod
+    async def put(http_session: requests.Session, url: str, path: str = None, data: dict = None, query: dict = None):
+        return await CDOAsyncRequests.call(CDORequests.put, http_session, url, path=path, data=data, query=query)
+
+    @staticmethod
+    async def delete(http_session: requests.Session, url: str, path: str = None):
+        return await CDOAsyncRequests.call(CDORequests.delete, http_session, url, path=path)
+
+    @staticmethod
+    async def gather(aws: list, concurrency: int = 10, return_exceptions: bool = False) -> list:
+        """Await the given awaitables with at most `concurrency` in flight and return the results in the same order"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(aw):
+            try:
+                async with semaphore:
+                    return await aw
+            finally:
+                if inspect.iscoroutine(aw):
+                    aw.close()  # never started because an earlier call failed
+
+        return await asyncio.gather(*(bounded(aw) for aw in aws), return_exceptions=return_exceptions)
+
+    @staticmethod
+    def run(aws: list, concurrency: int = 10, return_exceptions: bool = False) -> list:
+        """Synchronous entry point to CDOAsyncRequests.gather with a worker thread per concurrent call"""
+
+        async def runner():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(concurrency, 1)))
+            return await CDOAsyncRequests.gather(aws, concurrency, return_exceptions)
+
+        return asyncio.run(runner())
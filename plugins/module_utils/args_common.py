@@ -11,70 +11,148 @@ __metaclass__ = type
 COMMON_SPEC = {
     "api_key": {"required": True, "type": "str", "no_log": True},
     "region": {"default": "us", "choices": ["us", "eu", "apj"], "type": "str"},
+    "api_retry": {
+        "type": "dict",
+        "apply_defaults": True,
+        "options": {
+            "retries": {"default": 5, "type": "int"},
+            "backoff_factor": {"default": 0.5, "type": "float"},
+            "backoff_max": {"default": 30, "type": "float"},
+        },
+    },
 }
 
+
+def check_positive_options(module_params: dict, options: list) -> str | None:
+    """Return an error message for the first (section, option) pair whose value is set and below 1, else None"""
+    for section, option in options:
+        value = (module_params.get(section) or {}).get(option)
+        if value is not None and value < 1:
+            return f"{section}.{option} must be 1 or more, got {value}"
+
+
 #############################
 # Inventory
+FTD_ADD_OPTIONS = {
+    "retry": {"type": "int", "required": False, "default": 10},
+    "delay": {"type": "int", "required": False, "default": 1},
+    "device_name": {"required": True, "type": "str"},
+    "onboard_method": {"default": "cli", "choices": ["cli", "ltp"], "type": "str"},
+    "access_control_policy": {"default": "Default Access Control Policy", "type": "str"},
+    "is_virtual": {"default": False, "type": "bool"},
+    "license": {
+        "type": "list",
+        "choices": ["BASE", "THREAT", "URLFilter", "MALWARE", "CARRIER", "PLUS", "APEX", "VPNOnly"],
+        "default": ["BASE"],
+    },
+    "performance_tier": {
+        "choices": ["FTDv", "FTDv5", "FTDv10", "FTDv20", "FTDv30", "FTDv50", "FTDv100"],
+        "type": "str",
+    },
+    "serial": {"type": "str"},
+    "password": {"type": "str"},
+    "wait": {"default": True, "type": "bool"},
+}
+
+ASA_IOS_ADD_OPTIONS = {
+    "device_name": {"required": True, "type": "str"},
+    "ipv4": {"required": True, "type": "str"},
+    "mgmt_port": {"default": 443, "type": "int"},
+    "sdc": {"required": True, "type": "str"},
+    "username": {"required": True, "type": "str"},
+    "password": {"required": True, "type": "str"},
+    "ignore_cert": {"default": False, "type": "bool"},
+    "device_type": {"default": "asa", "choices": ["asa", "ios"], "type": "str"},
+    "retry": {"default": 10, "type": "int"},
+    "delay": {"default": 1, "type": "int"},
+    "wait": {"default": True, "type": "bool"},
+}
+
 INVENTORY_ARGUMENT_SPEC = COMMON_SPEC | {
+    "cache": {
+        "type": "dict",
+        "apply_defaults": True,
+        "options": {
+            "enabled": {"default": False, "type": "bool"},
+            "ttl": {"default": 300, "type": "int"},
+            "path": {"default": "~/.ansible/tmp/cisco_cdo_cache.sqlite", "type": "path"},
+            "metadata_ttl": {"default": 3600, "type": "int"},
+            "refresh_metadata": {"default": False, "type": "bool"},
+        },
+    },
     "gather": {
         "type": "dict",
         "options": {
             "filter": {"type": "str"},
             "device_type": {"default": "all", "choices": ["all", "asa", "ios", "ftd", "fmc"]},
+            "page_size": {"default": 50, "type": "int"},
+            "workers": {"default": 1, "type": "int"},
+            "fields": {"type": "list", "elements": "str"},
+            "delta": {"default": False, "type": "bool"},
+            "delta_marker": {"default": "lastDeployTimestamp", "type": "str"},
+            "output_format": {"default": "list", "choices": ["list", "columnar"], "type": "str"},
         },
     },
     "add": {
         "type": "dict",
         "options": {
-            "ftd": {
-                "type": "dict",
-                "options": {
-                    "retry": {"type": "int", "required": False, "default": 10},
-                    "delay": {"type": "int", "required": False, "default": 1},
-                    "device_name": {"required": True, "type": "str"},
-                    "onboard_method": {"default": "cli", "choices": ["cli", "ltp"], "type": "str"},
-                    "access_control_policy": {"default": "Default Access Control Policy", "type": "str"},
-                    "is_virtual": {"default": False, "type": "bool"},
-                    "license": {
-                        "type": "list",
-                        "choices": ["BASE", "THREAT", "URLFilter", "MALWARE", "CARRIER", "PLUS", "APEX", "VPNOnly"],
-                        "default": ["BASE"],
-                    },
-                    "performance_tier": {
-                        "choices": ["FTDv", "FTDv5", "FTDv10", "FTDv20", "FTDv30", "FTDv50", "FTDv100"],
-                        "type": "str",
-                    },
-                    "serial": {"type": "str"},
-                    "password": {"type": "str"},
-                },
-            },
-            "asa_ios": {
+            "ftd": {"type": "dict", "options": FTD_ADD_OPTIONS},
+            "asa_ios": {"type": "dict", "options": ASA_IOS_ADD_OPTIONS},
+            "ftd_devices": {"type": "list", "elements": "dict", "options": FTD_ADD_OPTIONS},
+            "asa_ios_devices": {"type": "list", "elements": "dict", "options": ASA_IOS_ADD_OPTIONS},
+            "concurrency": {"default": 10, "type": "int"},
+        },
+    },
+    "delete": {
+        "type": "dict",
+        "required_one_of": [["device_name", "device_names", "query"]],
+        "mutually_exclusive": [["device_name", "device_names", "query"], ["device_type", "query"]],
+        "options": {
+            "device_name": {"type": "str"},
+            "device_names": {"type": "list", "elements": "str"},
+            "query": {
                 "type": "dict",
+                "required_one_of": [["name", "tags", "device_type", "connectivity_state"]],
                 "options": {
-                    "device_name": {"required": True, "type": "str"},
-                    "ipv4": {"required": True, "type": "str"},
-                    "mgmt_port": {"default": 443, "type": "int"},
-                    "sdc": {"required": True, "type": "str"},
-                    "username": {"required": True, "type": "str"},
-                    "password": {"required": True, "type": "str"},
-                    "ignore_cert": {"default": False, "type": "bool"},
-                    "device_type": {"default": "asa", "choices": ["asa", "ios"], "type": "str"},
-                    "retry": {"default": 10, "type": "int"},
-                    "delay": {"default": 1, "type": "int"},
+                    "name": {"type": "str"},
+                    "tags": {"type": "dict"},
+                    "device_type": {"choices": ["asa", "ios", "ftd"], "type": "str"},
+                    "connectivity_state": {"type": "int"},
                 },
             },
+            "dry_run": {"default": False, "type": "bool"},
+            "page_size": {"default": 50, "type": "int"},
+            "device_type": {"choices": ["asa", "ios", "ftd"], "type": "str"},
+            "concurrency": {"default": 10, "type": "int"},
         },
     },
-    "delete": {
+    "status": {
         "type": "dict",
         "options": {
-            "device_name": {"required": True, "type": "str"},
-            "device_type": {"required": True, "choices": ["asa", "ios", "ftd"], "type": "str"},
+            "handles": {
+                "required": True,
+                "type": "list",
+                "elements": "dict",
+                "options": {
+                    "device_uid": {"required": True, "type": "str"},
+                    "specific_device_uid": {"type": "str"},
+                    "device_name": {"type": "str"},
+                    "device_type": {"type": "str"},
+                    "phase": {"type": "str"},
+                },
+            },
         },
     },
 }
 
-INVENTORY_REQUIRED_ONE_OF = ["gather", "add", "delete"]
+INVENTORY_POSITIVE_OPTIONS = [
+    ("gather", "page_size"),
+    ("gather", "workers"),
+    ("add", "concurrency"),
+    ("delete", "concurrency"),
+    ("delete", "page_size"),
+]
+INVENTORY_REQUIRED_ONE_OF = ["gather", "add", "delete", "status"]
 INVENTORY_MUTUALLY_EXCLUSIVE = []
 INVENTORY_REQUIRED_TOGETHER = []
 INVENTORY_REQUIRED_IF = []
@@ -120,23 +198,47 @@ NET_OBJS_REQUIRED_IF = []
 DEPLOY_ARGUMENT_SPEC = COMMON_SPEC | {
     "deploy": {
         "type": "dict",
+        "required_one_of": [["device_name", "device_names", "query"]],
+        "mutually_exclusive": [["device_name", "device_names", "query"], ["wave_size", "wave_percent"]],
         "options": {
             "device_type": {"default": "all", "choices": ["all", "asa"]},
-            "device_name": {"required": True, "type": "str"},
+            "device_name": {"type": "str"},
+            "device_names": {"type": "list", "elements": "str"},
+            "query": {
+                "type": "dict",
+                "required_one_of": [["name", "tags", "device_type"]],
+                "options": {
+                    "name": {"type": "str"},
+                    "tags": {"type": "dict"},
+                    "device_type": {"choices": ["asa", "ios"], "type": "str"},
+                },
+            },
+            "batch_size": {"default": 50, "type": "int"},
+            "wave_size": {"type": "int"},
+            "wave_percent": {"type": "int"},
+            "failure_budget": {"type": "int"},
             "timeout": {"default": 20, "type": "int"},
             "interval": {"default": 2, "type": "int"},
         },
     },
     "pending": {
         "type": "dict",
+        "required_if": [["summary", False, ["device_name"]]],
         "options": {
             "device_type": {"default": "all", "choices": ["all", "asa"], "type": "str"},
-            "device_name": {"required": True, "type": "str"},
+            "device_name": {"type": "str"},
+            "summary": {"default": False, "type": "bool"},
             "limit": {"default": 50, "type": "int"},
             "offset": {"default": 0, "type": "int"},
         },
     },
 }
+DEPLOY_POSITIVE_OPTIONS = [
+    ("deploy", "batch_size"),
+    ("deploy", "wave_size"),
+    ("deploy", "wave_percent"),
+    ("pending", "limit"),
+]
 DEPLOY_MUTUALLY_REQUIRED_ONE_OF = ["deploy", "pending"]
 DEPLOY_MUTUALLY_EXCLUSIVE = []
 DEPLOY_REQUIRED_TOGETHER = []
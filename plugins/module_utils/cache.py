@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Apache License v2.0+ (see LICENSE or https://www.apache.org/licenses/LICENSE-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "~/.ansible/tmp/cisco_cdo_cache.sqlite"
+SNAPSHOT_TTL = 30 * 24 * 3600  # Delta sync snapshots force a full re-sync after 30 days
+
+
+class CDOCache:
+    """On-disk cache of CDO API results shared by every fork on the controller. Entries are scoped to a tenant (a hash
+    of the API key, never the key itself) and region, grouped by namespace (e.g. "inventory") and keyed by the query
+    that produced them. SQLite in WAL mode lets many processes read and write the file at once."""
+
+    def __init__(
+        self,
+        token: str,
+        region: str,
+        path: str = None,
+        ttl: int = 300,
+        enabled: bool = True,
+        metadata_ttl: int = 3600,
+        refresh_metadata: bool = False,
+    ):
+        self.tenant = hashlib.sha256(token.strip().encode("utf-8")).hexdigest()
+        self.region = region
+        self.path = os.path.expanduser(path or DEFAULT_CACHE_PATH)
+        self.ttl = ttl
+        self.enabled = enabled
+        self.metadata_ttl = metadata_ttl
+        self.refresh_metadata = refresh_metadata
+        self.memo = dict()  # Values loaded by get_or_load during this run, shared by every client using this cache
+        self.lock = threading.RLock()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the cache database, creating it (readable by the owner only) if needed"""
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        is_new = not os.path.exists(self.path)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if is_new:
+            os.chmod(self.path, 0o600)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (tenant TEXT, region TEXT, namespace TEXT, key TEXT, value TEXT, "
+            "expires REAL, PRIMARY KEY (tenant, region, namespace, key))"
+        )
+        return conn
+
+    @staticmethod
+    def make_key(query) -> str:
+        """Turn a query (str, dict, or list) into a stable cache key"""
+        return hashlib.sha256(json.dumps(query, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, query, force: bool = False):
+        """Return the cached value for the query or None if there is no live entry. force reads even when the cache
+        is disabled for this task (used for delta sync snapshots, which always live in the cache file)"""
+        if not self.enabled and not force:
+            return
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE tenant=? AND region=? AND namespace=? AND key=? AND expires>?",
+                (self.tenant, self.region, namespace, self.make_key(query), time.time()),
+            ).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+
+    def set(self, namespace: str, query, value, ttl: int = None, force: bool = False):
+        """Store the value for the query for ttl seconds (defaults to the cache ttl). See get for force"""
+        if not self.enabled and not force:
+            return
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.tenant,
+                    self.region,
+                    namespace,
+                    self.make_key(query),
+                    json.dumps(value),
+                    time.time() + (self.ttl if ttl is None else ttl),
+                ),
+            )
+
+    def get_or_load(self, namespace: str, query, loader, ttl: int = None):
+        """Return the value for the query from this run's memo, the cache file (if enabled and not refreshing), or
+        the loader, in that order. Loaded values are kept in both. Only one thread loads a value at a time, so
+        concurrent onboarding pipelines share a single lookup. Empty results are not stored"""
+        key = (namespace, self.make_key(query))
+        with self.lock:
+            if key in self.memo:
+                return self.memo[key]
+            value = None if self.refresh_metadata else self.get(namespace, query)
+            if value is None:
+                value = loader()
+                if value:
+                    self.set(namespace, query, value, ttl)
+            if value:
+                self.memo[key] = value
+            return value
+
+    def invalidate(self, namespace: str = None):
+        """Drop the entries for this tenant and region (optionally only one namespace). This runs even when the cache
+        is disabled for the current task so that our own writes never leave stale entries for other tasks"""
+        if not os.path.exists(self.path):
+            return
+        self.memo = {key: value for key, value in self.memo.items() if namespace is not None and key[0] != namespace}
+        with self.connect() as conn:
+            if namespace is None:
+                conn.execute("DELETE FROM cache WHERE tenant=? AND region=?", (self.tenant, self.region))
+            else:
+                conn.execute(
+                    "DELETE FROM cache WHERE tenant=? AND region=? AND namespace=?",
+                    (self.tenant, self.region, namespace),
+                )
@@ -6,7 +6,7 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from dataclasses_json import dataclass_json
 
 
@@ -53,3 +53,11 @@ class FTD(Device):
 @dataclass
 class ASA_IOS(Device):
     liveAsaDevice: bool
+
+
+# Output fields per CDO deviceType, computed once from the models above so that device normalization can build the
+# model's dict straight from the API record (no json.dumps/from_json/to_dict round trip per device)
+DEVICE_MODELS = {"ASA": ASA_IOS, "IOS": ASA_IOS, "FTDC": FTD, "FMCE": FMC}
+DEVICE_FIELDS = {device_type: tuple(f.name for f in fields(model)) for device_type, model in DEVICE_MODELS.items()}
+# Every output field across the device types, in model order (the columns of the columnar gather output)
+ALL_DEVICE_FIELDS = tuple(dict.fromkeys(field for device_fields in DEVICE_FIELDS.values() for field in device_fields))
@@ -7,11 +7,11 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import requests
-from time import sleep
 from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
 from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
 from ansible_collections.cisco.cdo.plugins.module_utils._version import __version__
-from ansible_collections.cisco.cdo.plugins.module_utils.errors import RetriesExceeded, CmdExecutionError
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import CmdExecutionError
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOPoller
 from ansible_collections.cisco.cdo.plugins.module_utils.query import CDOQuery
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
 from ansible_collections.cisco.cdo.plugins.module_utils.errors import (
@@ -35,16 +35,8 @@ class CLI:
 
     def poll_cmd_execution(self, transaction_id: str):
         """Wait for the cli commands to complete execution"""
-        response = None
-        poll_attempt = 0
-        while True:
-            if poll_attempt > self.module_params.get("retries"):
-                raise (
-                    RetriesExceeded(
-                        "Timeout waiting for the command(s) to execute on the device. Perhaps try raising "
-                        "the retries or interval values. "
-                    )
-                )
+
+        def check():
             response = CDORequests.get(
                 self.http_session,
                 f"https://{self.endpoint}",
@@ -53,22 +45,29 @@ class CLI:
             )
             if isinstance(response, list) and response:
                 if response[0].get("executionState") == "DONE":
-                    if not response[0].get("response"):
-                        return
-                    else:
-                        return response[0].get("response")
+                    return response[0].get("response") or ""
                 elif response[0].get("errorMsg"):
                     raise CmdExecutionError(
                         response[0].get("errorMsg")
                     )  # For example: If the device is not sync'd or unreachable
-            sleep(self.module_params.get("interval"))
-            poll_attempt += 1
+
+        return (
+            CDOPoller.from_retries(self.module_params.get("retries"), self.module_params.get("interval")).poll(
+                check,
+                "Timeout waiting for the command(s) to execute on the device. Perhaps try raising "
+                "the retries or interval values. ",
+            )
+            or None
+        )
 
     def get_device_details(self) -> dict:
         """Get the device details from CDO inventory"""
-        self.module_params["filter"] = self.module_params["device_name"]
-        device_details = self.inventory_client.gather_inventory()
-        return device_details
+        return self.get_devices_details([self.module_params["device_name"]])[self.module_params["device_name"]]
+
+    def get_devices_details(self, device_names: list) -> dict:
+        """Get the device details for many devices from CDO inventory in a few batched queries.
+        Return a {device_name: [matching devices]} index"""
+        return self.inventory_client.resolve_device_names(device_names)
 
     def is_command_allowed_out_of_sync(self) -> bool:
         """Returns true if all of the commands are in the allowed-out-of-sync list (See CDO Docs) If there is a command
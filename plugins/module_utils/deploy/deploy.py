@@ -8,19 +8,25 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 # fmt: off
+import math
 import requests
 import time
-from time import sleep
 from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
-from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests, CDOAsyncRequests
 from ansible_collections.cisco.cdo.plugins.module_utils._version import __version__
 from ansible_collections.cisco.cdo.plugins.module_utils.query import CDOQuery
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
-from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, TooManyMatches
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOPoller, CDOBatchPoller, CDOTimings
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, TooManyMatches, RetriesExceeded
 # fmt: on
 
 # TODO: Link with cdFMC Ansible module to deploy staged FTD configs
 
+# FTD changes are deployed by the cdFMC, not by a CDO deploy job
+FTD_DEVICE_TYPES = ["FTDC", "FMC_MANAGED_DEVICE"]
+DEPLOY_FAILED_STATES = ["ERROR", "FAILED", "CANCELLED"]
+
+
 class Deploy(Inventory):
     def __init__(self, module_params: dict, http_session: requests.session, endpoint: str):
         self.module_params = module_params
@@ -28,18 +34,196 @@ class Deploy(Inventory):
         self.endpoint = endpoint
         self.changed = False
         self.pending_changes = None
+        self.timings = CDOTimings()
 
     def poll_deploy_job(self, job_uid: str, retry, interval):
         """Poll the deploy job for a successful completion"""
-        while retry > 0:
+
+        def check():
             job_status = CDORequests.get(
                 self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.JOBS.value}/{job_uid}"
             )
             state_uid = job_status.get("objRefs")[0].get("uid")
             if job_status.get("stateMachinesProgress").get(state_uid).get("progressStatus") == "DONE":
                 return job_status
-            sleep(interval)
-            retry -= 1
+
+        try:
+            return CDOPoller.from_retries(retry, interval).poll(check)
+        except RetriesExceeded:
+            return None
+
+    @staticmethod
+    def deploy_payload(device_uids: list) -> dict:
+        """Return a deploy job covering every given device"""
+        return {
+            "action": "WRITE",
+            "overallProgress": "PENDING",
+            "triggerState": "PENDING_ORCHESTRATION",
+            "schedule": None,
+            "objRefs": [{"uid": uid, "namespace": "targets", "type": "devices"} for uid in device_uids],
+            "jobContext": None,
+        }
+
+    def poll_deploy_jobs(self, job_uids: list, device_uids: list, retry, interval) -> dict:
+        """Poll many deploy jobs together, with one batched jobs query per check, until every one of the device_uids
+        has reached a terminal progress status. A job that has not reported its stateMachinesProgress yet keeps the
+        poll going. Return a {device_uid: progressStatus} index. Devices still running (or not reported) when the
+        poll deadline passes are left with their last seen status, if any"""
+        status_source = CDOBatchPoller(self.http_session, self.endpoint, path=CDOAPI.JOBS.value)
+        progress = dict()
+
+        def check():
+            for job in status_source.fetch(job_uids).values():
+                for uid, state in (job.get("stateMachinesProgress") or {}).items():
+                    progress[uid] = state.get("progressStatus")
+            statuses = [progress.get(uid) for uid in device_uids]
+            if all(status == "DONE" or status in DEPLOY_FAILED_STATES for status in statuses):
+                return progress
+
+        poller = CDOPoller.from_retries(retry, interval)
+        try:
+            return poller.poll(check)
+        except RetriesExceeded:
+            return progress
+        finally:
+            self.timings.record_poll(poller)
+
+    def select_devices(self) -> tuple:
+        """Return the devices named in device_names, or matching the query, that have changes staged in CDO, and
+        a {device_name: reason} index of the ones that were skipped"""
+        skipped = dict()
+        if self.module_params.get("device_names"):
+            devices = list()
+            for name, matches in self.find_devices(self.module_params.get("device_names")).items():
+                if not matches:
+                    skipped[name] = "not_found"
+                elif len(matches) > 1:
+                    skipped[name] = "too_many_matches"
+                elif matches[0].get("configState") != "NOT_SYNCED":
+                    skipped[name] = "no_pending_changes"
+                else:
+                    devices.append(matches[0])
+        else:
+            devices = self.gather_inventory_query(
+                CDOQuery.get_selection_query({**self.module_params.get("query"), "config_state": "NOT_SYNCED"})
+            )
+        for device in [device for device in devices if device.get("deviceType") in FTD_DEVICE_TYPES]:
+            skipped[device.get("name")] = "deployed_by_cdfmc"
+            devices.remove(device)
+        return devices, skipped
+
+    def split_waves(self, devices: list) -> list:
+        """Split the devices into waves of wave_size devices, or of wave_percent percent of the devices (at least
+        one). Without either, every device is deployed in a single wave"""
+        size = len(devices) or 1
+        if self.module_params.get("wave_size"):
+            size = self.module_params.get("wave_size")
+        elif self.module_params.get("wave_percent"):
+            size = max(1, math.ceil(len(devices) * self.module_params.get("wave_percent") / 100))
+        return [devices[i : i + size] for i in range(0, len(devices), size)]
+
+    def deploy_wave(self, devices: list) -> tuple:
+        """Deploy one wave: split the devices into jobs of batch_size devices, submit the jobs together, and poll
+        the per-device progress of every job with one shared query per check. The devices of a job that CDO did not
+        accept are failed, the other jobs still run. Return the job and device entries"""
+        batch_size = self.module_params.get("batch_size")
+        batches = [devices[i : i + batch_size] for i in range(0, len(devices), batch_size)]
+        jobs = CDOAsyncRequests.run(
+            [
+                CDOAsyncRequests.post(
+                    self.http_session,
+                    f"https://{self.endpoint}",
+                    path=CDOAPI.JOBS.value,
+                    data=self.deploy_payload([device.get("uid") for device in batch]),
+                )
+                for batch in batches
+            ],
+            return_exceptions=True,
+        )
+        submitted = [job.get("uid") for job in jobs if not isinstance(job, Exception)]
+        submitted_devices = [
+            device.get("uid") for job, batch in zip(jobs, batches) if not isinstance(job, Exception) for device in batch
+        ]
+        self.changed = self.changed or bool(submitted)
+        progress = dict()
+        if submitted:
+            progress = self.poll_deploy_jobs(
+                submitted, submitted_devices, self.module_params.get("timeout"), self.module_params.get("interval")
+            )
+        job_entries, device_entries = list(), list()
+        for job, batch in zip(jobs, batches):
+            error = str(getattr(job, "message", job)) if isinstance(job, Exception) else None
+            job_uid = None if error else job.get("uid")
+            job_entries.append({"uid": job_uid, "device_uids": [device.get("uid") for device in batch]})
+            if error:
+                job_entries[-1]["error"] = error
+            for device in batch:
+                status = progress.get(device.get("uid"))
+                outcome = "deployed" if status == "DONE" else "failed" if status in DEPLOY_FAILED_STATES else "timeout"
+                device_entries.append(
+                    {
+                        "device_name": device.get("name"),
+                        "device_uid": device.get("uid"),
+                        "job_uid": job_uid,
+                        "progress_status": status,
+                        "status": "failed" if error else outcome,
+                    }
+                )
+                if error:
+                    device_entries[-1]["error"] = f"Deploy job not submitted: {error}"
+        return job_entries, device_entries
+
+    def deploy_many(self) -> dict:
+        """Deploy the staged changes of many devices in rolling waves (see split_waves). The devices of a wave are
+        deployed together (see deploy_wave), so a wave takes as long as its slowest device, and the next wave starts
+        once every device of the previous one has finished. Devices whose job was rejected, and every device of a
+        wave that could not be deployed or polled, count as failed. Once more devices than failure_budget have failed
+        (or timed out), the remaining waves are not started. Every wave reports its timing and throughput"""
+        devices, skipped = self.select_devices()
+        budget = self.module_params.get("failure_budget")
+        result = {"jobs": list(), "devices": list(), "waves": list(), "skipped": skipped, "stopped": False}
+        for number, wave in enumerate(self.split_waves(devices), start=1):
+            if budget is not None and sum(device["status"] != "deployed" for device in result["devices"]) > budget:
+                result["stopped"] = True
+                result["devices"].extend(
+                    {"device_name": device.get("name"), "device_uid": device.get("uid"), "status": "not_started"}
+                    for device in wave
+                )
+                continue
+            error = None
+            try:
+                with self.timings.phase(f"wave_{number}") as timing:
+                    jobs, deployed = self.deploy_wave(wave)
+            except Exception as e:  # e.g. polling failed: count the whole wave against the budget and carry on
+                error = str(getattr(e, "message", e))
+                jobs = list()
+                deployed = [
+                    {"device_name": device.get("name"), "device_uid": device.get("uid"), "status": "failed"}
+                    for device in wave
+                ]
+            result["jobs"].extend(jobs)
+            result["devices"].extend(deployed)
+            result["waves"].append(
+                {
+                    "wave": number,
+                    "devices": len(wave),
+                    "deployed": sum(device["status"] == "deployed" for device in deployed),
+                    "failed": sum(device["status"] != "deployed" for device in deployed),
+                    "start": timing["start"],
+                    "duration": timing["duration"],
+                    "poll_iterations": timing["poll_iterations"],
+                    "devices_per_minute": round(len(wave) * 60 / timing["duration"], 1) if timing["duration"] else None,
+                }
+            )
+            if error:
+                result["waves"][-1]["error"] = error
+        result["deployed"] = sum(device["status"] == "deployed" for device in result["devices"])
+        result["failed"] = sum(device["status"] in ["failed", "timeout"] for device in result["devices"])
+        return result
+
+    def find_devices(self, device_names: list) -> dict:
+        """Resolve many device names in a few batched inventory queries. Return a {device_name: [devices]} index"""
+        return self.resolve_device_names(device_names)
 
     def deploy_changes(self):
         """Given the device name, deploy the pending config changes to the device if there are any"""
@@ -56,24 +240,16 @@ class Deploy(Inventory):
         pending_config = self.get_pending_deploy()
 
         # Deploy the pending config
-        self.module_params["filter"] = self.module_params.get("device_name")
-        device = self.gather_inventory()
+        device = self.find_devices([self.module_params.get("device_name")])[self.module_params.get("device_name")]
         if len(device) == 0:
             raise (DeviceNotFound(f"Could not find device {self.module_params.get('device_name')}"))
-        elif len(device) == 0:
+        elif len(device) > 1:
             raise (
                 TooManyMatches(
                     f"{len(device)} matched - {self.module_params.get('device_name')} not a unique device name"
                 )
             )
-        payload = {
-            "action": "WRITE",
-            "overallProgress": "PENDING",
-            "triggerState": "PENDING_ORCHESTRATION",
-            "schedule": None,
-            "objRefs": [{"uid": device[0].get("uid"), "namespace": "targets", "type": "devices"}],
-            "jobContext": None,
-        }
+        payload = self.deploy_payload([device[0].get("uid")])
 
         # Submit the job then return the completed job details after polling for deploy completion
         job = CDORequests.post(self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.JOBS.value}", data=payload)
@@ -85,6 +261,59 @@ class Deploy(Inventory):
             "changes_deployed": pending_config,
         }
 
+    def count_pending_changes(self, total: int) -> dict:
+        """Page the pending changes with a minimal resolve (the device of each change, no change bodies) and return a
+        {device_uid: number of pending changes} index. Paging stops at the total or at the first empty page"""
+        counts, offset, limit = dict(), 0, self.module_params.get("limit")
+        while offset < total:
+            page = CDORequests.get(
+                self.http_session,
+                f"https://{self.endpoint}",
+                path=f"{CDOAPI.DEPLOY.value}",
+                query=CDOQuery.pending_changes_devices_query(self.module_params, limit, offset),
+            )
+            if not page:
+                break
+            for item in page:
+                uid = (item.get("device") or {}).get("uid")
+                counts[uid] = counts.get(uid, 0) + 1
+            offset += len(page)
+        return counts
+
+    def get_pending_summary(self) -> dict:
+        """Summarize the staged changes of the named devices (a * wildcard pattern) or of the whole tenant, grouped
+        by device, without downloading the change bodies: one server-side count of the pending changelogs, a
+        paginated query of the device each changelog belongs to, and a paginated minimal inventory query for the
+        names and types of those devices"""
+        q = CDOQuery.pending_changes_query(self.module_params, agg=True)
+        count = CDORequests.get(
+            self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.DEPLOY.value}", query=q
+        ).get("aggregationQueryResult")
+        counts = self.count_pending_changes(count or 0)
+        selection = {"name": self.module_params.get("device_name"), "config_state": "NOT_SYNCED"}
+        if self.module_params.get("device_type") != "all":
+            selection["device_type"] = self.module_params.get("device_type")
+        devices = [
+            device
+            for device in self.gather_inventory_query(
+                CDOQuery.get_selection_query(selection), self.module_params.get("limit")
+            )
+            if device.get("deviceType") not in FTD_DEVICE_TYPES
+        ]
+        summary = {"pending_changes": count or 0, "device_count": len(devices), "count_by_type": dict(), "devices": []}
+        for device in devices:
+            device_type = device.get("deviceType").lower()
+            summary["count_by_type"][device_type] = summary["count_by_type"].get(device_type, 0) + 1
+            summary["devices"].append(
+                {
+                    "device_name": device.get("name"),
+                    "device_uid": device.get("uid"),
+                    "device_type": device_type,
+                    "pending_changes": counts.get(device.get("uid"), 0),
+                }
+            )
+        return summary
+
     def get_pending_deploy(self) -> str:
         """Given a device name, return the config staged in CDO to be deployed, if any"""
         pending_change = list()
@@ -8,11 +8,12 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import requests
-from time import sleep
 from ansible_collections.cisco.cdo.plugins.module_utils.crypto import CDOCrypto
 from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
 from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils.cache import CDOCache
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOBatchPoller, CDOTimings
 from ansible_collections.cisco.cdo.plugins.module_utils.errors import (
     SDCNotFound,
     InvalidCertificate,
@@ -20,21 +21,33 @@ from ansible_collections.cisco.cdo.plugins.module_utils.errors import (
     DuplicateObject,
     APIError,
     CredentialsFailure,
+    RetriesExceeded,
 )
 
 
 class ASA_IOS_Inventory(Inventory):
     """Class used for CDO ASA Operations (Extends the Inventory base class in inventory.py)"""
 
-    def __init__(self, module_params: dict, http_session: requests.session, endpoint: str):
+    def __init__(
+        self,
+        module_params: dict,
+        http_session: requests.session,
+        endpoint: str,
+        cache: CDOCache = None,
+        status_source: CDOBatchPoller = None,
+    ):
         self.module_params = module_params
         self.http_session = http_session
         self.endpoint = endpoint
+        self.cache = cache
+        self.status_source = status_source
+        self.timings = CDOTimings()
         self.changed = False
 
     def connectivity_poll(self, uid: str) -> bool:
         """Check device connectivity or fail after retry attempts have expired"""
-        for i in range(self.module_params.get("retry")):
+
+        def check():
             device = self.get_device(uid)
             if device["connectivityState"] == -2:
                 if self.module_params.get("ignore_cert"):
@@ -45,15 +58,19 @@ class ASA_IOS_Inventory(Inventory):
                     raise InvalidCertificate(f"{device['connectivityError']}")
             if device["connectivityState"] > -1 or device["status"] == "WAITING_FOR_DATA":
                 return True
-            sleep(self.module_params.get("delay"))
-        raise DeviceUnreachable(
-            f"Device {self.module_params.get('device_name')} was not reachable at "
-            f"{self.module_params.get('ipv4')}:{self.module_params.get('mgmt_port')} by CDO"
-        )
+
+        try:
+            return self.poll(check)
+        except RetriesExceeded:
+            raise DeviceUnreachable(
+                f"Device {self.module_params.get('device_name')} was not reachable at "
+                f"{self.module_params.get('ipv4')}:{self.module_params.get('mgmt_port')} by CDO"
+            )
 
     def asa_credentials_polling(self, uid: str) -> dict:
         """Check credentials have been used successfully  or fail after retry attempts have expired"""
-        for i in range(self.module_params.get("retry")):
+
+        def check():
             result = CDORequests.get(
                 self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.ASA_CONFIG.value}/{uid}"
             )
@@ -63,22 +80,32 @@ class ASA_IOS_Inventory(Inventory):
                 )
             elif result["state"] == "PENDING_GET_CONFIG_DONE" or result["state"] == "DONE" or result["state"] == "IDLE":
                 return result
-            sleep(self.module_params.get("delay"))
-        raise APIError(
-            f"Credentials for device {self.module_params.get('device_name')} were sent but we never reached a known good state."
-        )
+
+        try:
+            return self.poll(check)
+        except RetriesExceeded:
+            raise APIError(
+                f"Credentials for device {self.module_params.get('device_name')} were sent but we never reached a "
+                "known good state."
+            )
 
     def ios_credentials_polling(self, uid: str) -> dict:
         """Check to see if the supplied credentials are accepted by the live device"""
-        for i in range(self.module_params.get("retry")):
-            device = self.get_device(uid)
+        device = dict()
+
+        def check():
+            device.update(self.get_device(uid))
             if device["connectivityState"] == -5:
-                sleep(self.module_params.get("delay"))
+                return None
             elif device["connectivityError"] is not None:
                 raise CredentialsFailure(device.get("connectivityError"))
             elif device["connectivityState"] > 0:
                 return device
-        raise CredentialsFailure(f"Device remains in connectivity state {device.get('connectivityState')}")
+
+        try:
+            return self.poll(check)
+        except RetriesExceeded:
+            raise CredentialsFailure(f"Device remains in connectivity state {device.get('connectivityState')}")
 
     def update_device(self, uid: str, data: dict):
         """Update an existing device's attributes"""
@@ -87,8 +114,9 @@ class ASA_IOS_Inventory(Inventory):
         )
 
     def add_asa_ios(self):
-        """Add ASA or IOS device to CDO"""
-        lar_list = self.get_lar_list()
+        """Add ASA or IOS device to CDO. The duration and poll iterations of each phase are recorded in self.timings"""
+        with self.timings.phase("metadata_lookup"):
+            lar_list = self.get_lar_list()
         if not lar_list:
             raise (SDCNotFound("Could not find SDC"))
         else:
@@ -111,8 +139,11 @@ class ASA_IOS_Inventory(Inventory):
 
         try:
             path = CDOAPI.DEVICES.value
-            device = CDORequests.post(self.http_session, f"https://{self.endpoint}", path=path, data=asa_ios_device)
-            self.connectivity_poll(device["uid"])
+            with self.timings.phase("device_post"):
+                device = CDORequests.post(self.http_session, f"https://{self.endpoint}", path=path, data=asa_ios_device)
+            self.invalidate_inventory_cache()
+            with self.timings.phase("connectivity_poll"):
+                self.connectivity_poll(device["uid"])
         except DuplicateObject as e:
             raise e
 
@@ -122,13 +153,24 @@ class ASA_IOS_Inventory(Inventory):
 
         if self.module_params.get("device_type").upper() == "ASA":
             creds_crypto["state"] = "CERT_VALIDATED"
-            specific_device = self.get_specific_device(device["uid"])
-            path = f"{CDOAPI.ASA_CONFIG.value}/{specific_device['uid']}"
-            CDORequests.put(self.http_session, f"https://{self.endpoint}", path=path, data=creds_crypto)
-            self.asa_credentials_polling(specific_device["uid"])
+            with self.timings.phase("credentials_put"):
+                specific_device = self.get_specific_device(device["uid"])
+                path = f"{CDOAPI.ASA_CONFIG.value}/{specific_device['uid']}"
+                CDORequests.put(self.http_session, f"https://{self.endpoint}", path=path, data=creds_crypto)
+            if not self.module_params.get("wait", True):
+                return self.onboarding_handle(device["uid"], specific_device["uid"], "credentials")
+            with self.timings.phase("credentials_poll"):
+                self.asa_credentials_polling(specific_device["uid"])
+            self.invalidate_inventory_cache()
             return self.get_device(device["uid"])
         elif self.module_params.get("device_type").upper() == "IOS":
             creds_crypto["stateMachineContext"] = {"acceptCert": True}
             path = f"{CDOAPI.DEVICES.value}/{device['uid']}"
-            CDORequests.put(self.http_session, f"https://{self.endpoint}", path=path, data=creds_crypto)
-            return self.ios_credentials_polling(device["uid"])
+            with self.timings.phase("credentials_put"):
+                CDORequests.put(self.http_session, f"https://{self.endpoint}", path=path, data=creds_crypto)
+            if not self.module_params.get("wait", True):
+                return self.onboarding_handle(device["uid"], phase="credentials")
+            with self.timings.phase("credentials_poll"):
+                ios_device = self.ios_credentials_polling(device["uid"])
+            self.invalidate_inventory_cache()
+            return ios_device
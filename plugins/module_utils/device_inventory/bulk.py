@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#
+# Apache License v2.0+ (see LICENSE or https://www.apache.org/licenses/LICENSE-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+# fmt: off
+import requests
+from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDOAsyncRequests
+from ansible_collections.cisco.cdo.plugins.module_utils.cache import CDOCache
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOBatchPoller, CDOTimings
+from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
+from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.asa import ASA_IOS_Inventory
+from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.ftd import FTDInventory
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import DuplicateObject
+# fmt: on
+
+
+class BulkInventory(Inventory):
+    """Class used to onboard many ASA/IOS/FTD devices in one module run (Extends the Inventory base class in
+    inventory.py). Every device runs its own onboarding workflow in a worker thread, at most `concurrency` at a time.
+    The workflows share the http session and the tenant metadata cache, so the cdFMC, SDC and access policy lookups
+    are made once for the whole batch, and an optional status source (CDOBatchPoller) that polls the state of every
+    onboarding device in one query per tick."""
+
+    def __init__(
+        self,
+        module_params: dict,
+        http_session: requests.session,
+        endpoint: str,
+        cache: CDOCache = None,
+        status_source: CDOBatchPoller = None,
+    ):
+        self.module_params = module_params
+        self.http_session = http_session
+        self.endpoint = endpoint
+        self.cache = cache
+        self.status_source = status_source
+        self.timings = CDOTimings()
+        self.changed = False
+
+    def add_device(self, device_type: str, device_params: dict) -> dict:
+        """Onboard a single device and return its result entry. Failures are reported in the entry, not raised"""
+        if device_type == "ftd":
+            client = FTDInventory(device_params, self.http_session, self.endpoint, self.cache, self.status_source)
+            add = client.add_ftd
+        else:
+            client = ASA_IOS_Inventory(device_params, self.http_session, self.endpoint, self.cache, self.status_source)
+            add = client.add_asa_ios
+            device_type = device_params.get("device_type")
+        result = {"device_name": device_params.get("device_name"), "device_type": device_type}
+        try:
+            result["device" if device_params.get("wait", True) else "handle"] = add()
+            result["status"] = "added"
+            self.changed = True
+        except DuplicateObject as e:
+            result["status"] = "duplicate"
+            result["error"] = e.message
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(getattr(e, "message", e))
+        result["timings"] = client.timings.phases
+        return result
+
+    def add_ltp_devices(self, ftd_devices: list, concurrency: int = 10) -> list:
+        """Onboard many FTDs by serial number (LTP) in stages instead of one full workflow per device: one duplicate
+        check for every serial in a few OR-joined queries, concurrent device creation, then one concurrent pass of
+        claim triggers. A serial given more than once is only onboarded for its first entry, the others are
+        reported as duplicates. Return one result entry per serial, in the order given"""
+        clients = [
+            FTDInventory(device, self.http_session, self.endpoint, self.cache, self.status_source)
+            for device in ftd_devices
+        ]
+        results = [
+            {"device_name": device.get("device_name"), "device_type": "ftd", "serial": device.get("serial")}
+            for device in ftd_devices
+        ]
+        with self.timings.phase("duplicate_check"):
+            matches = self.resolve_device_names([result["serial"] for result in results if result["serial"]])
+        pending, seen = list(), set()
+        for client, result in zip(clients, results):
+            if not result["serial"]:
+                result["status"] = "failed"
+                result["error"] = f"A serial number is required to onboard {result['device_name']} by LTP"
+            elif matches[result["serial"]]:
+                result["status"] = "duplicate"
+                result["error"] = f"Device with serial number {result['serial']} exists in tenant"
+            elif result["serial"] in seen:
+                result["status"] = "duplicate"
+                result["error"] = f"Serial number {result['serial']} is given more than once"
+            else:
+                seen.add(result["serial"])
+                pending.append((client, result))
+
+        with self.timings.phase("device_create"):
+            created = CDOAsyncRequests.run(
+                [
+                    CDOAsyncRequests.call(lambda c: c.create_ftd_device(c.ltp_device(c.build_ftd_device())), client)
+                    for client, _ in pending
+                ],
+                concurrency=concurrency,
+                return_exceptions=True,
+            )
+        to_claim = list()
+        for (client, result), outcome in zip(pending, created):
+            if isinstance(outcome, Exception):
+                result["status"] = "failed"
+                result["error"] = str(getattr(outcome, "message", outcome))
+            else:
+                self.changed = True
+                to_claim.append((client, result, outcome))
+
+        with self.timings.phase("claim_trigger"):
+            claimed = CDOAsyncRequests.run(
+                [
+                    CDOAsyncRequests.call(client.claim_ftd_device, specific["uid"])
+                    for client, _, (_, specific) in to_claim
+                ],
+                concurrency=concurrency,
+                return_exceptions=True,
+            )
+        claimed_uids = [
+            device["uid"]
+            for (_, _, (device, _)), outcome in zip(to_claim, claimed)
+            if not isinstance(outcome, Exception)
+        ]
+        devices = CDOBatchPoller(self.http_session, self.endpoint).fetch(claimed_uids)  # one query per 50 devices
+        for (client, result, (device, specific)), outcome in zip(to_claim, claimed):
+            if isinstance(outcome, Exception):
+                result["status"] = "failed"
+                result["error"] = str(getattr(outcome, "message", outcome))
+            elif client.module_params.get("wait", True):
+                result["status"] = "added"
+                result["device"] = devices.get(device["uid"], device)
+            else:
+                result["status"] = "added"
+                result["handle"] = client.onboarding_handle(device["uid"], specific["uid"], "claim")
+        for client, result in zip(clients, results):
+            result["timings"] = client.timings.phases
+        return results
+
+    def add_devices(self, ftd_devices: list = None, asa_ios_devices: list = None, concurrency: int = 10) -> list:
+        """Onboard every given device with at most `concurrency` onboarding workflows in flight. FTDs onboarded by
+        serial number go through the staged add_ltp_devices pipeline. Results are returned in the order the devices
+        were given, FTDs first"""
+        targets = [("ftd", device) for device in ftd_devices or []]
+        targets += [("asa_ios", device) for device in asa_ios_devices or []]
+        ltp = [i for i, (_, device) in enumerate(targets) if (device.get("onboard_method") or "").lower() == "ltp"]
+        workflows = [i for i in range(len(targets)) if i not in ltp]
+        results = dict(zip(ltp, self.add_ltp_devices([targets[i][1] for i in ltp], concurrency) if ltp else []))
+        results.update(
+            zip(
+                workflows,
+                CDOAsyncRequests.run(
+                    [CDOAsyncRequests.call(self.add_device, *targets[i]) for i in workflows],
+                    concurrency=concurrency,
+                ),
+            )
+        )
+        return [results[i] for i in range(len(targets))]
@@ -8,25 +8,64 @@ __metaclass__ = type
 
 # fmt: off
 from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
-from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests, CDOAsyncRequests
+from ansible_collections.cisco.cdo.plugins.module_utils.cache import CDOCache
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOBatchPoller
+from ansible_collections.cisco.cdo.plugins.module_utils.query import CDOQuery
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
-from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, TooManyMatches
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import (
+    DeviceNotFound,
+    TooManyMatches,
+    UnsupportedDeviceType,
+)
 import requests
 # fmt: on
 
+FTD_DEVICE_TYPES = ["FTDC", "FMC_MANAGED_DEVICE"]  # deleted through the cdFMC, not with a DELETE
+DELETE_DEVICE_TYPES = ["asa", "ios", "ftd"]  # any other device type (e.g. the cdFMC itself) is never deleted
+
+
 class DeleteInventory(Inventory):
     """Class used to remove ASA/IOS/FTD devices from CDO/cdFMC (Extends the Inventory base class in inventory.py)"""
-    def __init__(self, module_params: dict, http_session: requests.session, endpoint: str):
+
+    def __init__(
+        self,
+        module_params: dict,
+        http_session: requests.session,
+        endpoint: str,
+        cache: CDOCache = None,
+        status_source: CDOBatchPoller = None,
+    ):
         self.module_params = module_params
         self.http_session = http_session
         self.endpoint = endpoint
+        self.cache = cache
+        self.status_source = status_source
         self.changed = False
 
+    def resolve_device_names(self, names: list, chunk_size: int = 20, concurrency: int = 4) -> dict:
+        """Like Inventory.resolve_device_names, but the cdFMC never matches: it cannot be deleted with this module"""
+        return {
+            name: [device for device in devices if device.get("deviceType") != "FMCE"]
+            for name, devices in super().resolve_device_names(names, chunk_size, concurrency).items()
+        }
+
+    def find_devices_for_deletion(self, device_names: list) -> dict:
+        """Resolve every device we intend to delete in a few batched queries and return a {name: device} index"""
+        devices = dict()
+        for device_name, device_list in self.resolve_device_names(device_names).items():
+            if not device_list:
+                raise DeviceNotFound(f"Cannot delete {device_name} - device by that name not found")
+            elif len(device_list) > 1:
+                raise TooManyMatches(f"Cannot delete {device_name} - more than 1 device matches name")
+            devices[device_name] = device_list[0]
+        return devices
+
     def find_device_for_deletion(self):
         """Find the object we intend to delete"""
-        # TODO: Paging for large device lists
-        self.module_params["filter"] = self.module_params.get("device_name")
-        device_list = self.gather_inventory()
+        device_list = self.resolve_device_names([self.module_params.get("device_name")])[
+            self.module_params.get("device_name")
+        ]
         if not device_list:
             raise DeviceNotFound(
                 f"Cannot delete {self.module_params.get('device_name')} - device by that name not found"
@@ -38,33 +77,149 @@ class DeleteInventory(Inventory):
         else:
             return device_list[0]
 
+    def get_device_type(self, device: dict) -> str:
+        """Return the delete device type (asa, ios, ftd) from the device's deviceType. A user-given device_type only
+        narrows the name lookup: it never decides how a resolved device is deleted"""
+        if device.get("deviceType") in FTD_DEVICE_TYPES:
+            return "ftd"
+        return (device.get("deviceType") or "").lower()
+
+    def delete_ftds(self, uids: list):
+        """Remove one or more FTDs from the cdFMC (and CDO) with a single PENDING_DELETE_FTDC trigger"""
+        cdfmc = self.get_cdfmc()
+        cdfmc_specific_device = self.get_cdfmc_specific_device(cdfmc["uid"])
+        data = {
+            "queueTriggerState": "PENDING_DELETE_FTDC",
+            "stateMachineContext": {"ftdCDeviceIDs": ",".join(uids)},
+        }
+        return CDORequests.put(
+            self.http_session,
+            f"https://{self.endpoint}",
+            path=f"{CDOAPI.FMC.value}/{cdfmc_specific_device['uid']}",
+            data=data,
+        )
+
     def delete_device(self):
         """Orchestrate deleting the device"""
         try:
             device = self.find_device_for_deletion()
             self.working_set(device["uid"])
-            if (
-                self.module_params.get("device_type").upper() == "ASA"
-                or self.module_params.get("device_type").upper() == "IOS"
-            ):
+            if self.get_device_type(device) == "asa" or self.get_device_type(device) == "ios":
                 response = CDORequests.delete(
                     self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.DEVICES.value}/{device['uid']}"
                 )
+                self.invalidate_inventory_cache()
                 return response
 
-            elif self.module_params.get("device_type").upper() == "FTD":
-                cdfmc = self.get_cdfmc()
-                cdfmc_specific_device = self.get_specific_device(cdfmc["uid"])
-                data = {
-                    "queueTriggerState": "PENDING_DELETE_FTDC",
-                    "stateMachineContext": {"ftdCDeviceIDs": f"{device['uid']}"},
-                }
-                response = CDORequests.put(
-                    self.http_session,
-                    f"https://{self.endpoint}",
-                    path=f"{CDOAPI.FMC.value}/{cdfmc_specific_device['uid']}",
-                    data=data,
-                )
+            elif self.get_device_type(device) == "ftd":
+                response = self.delete_ftds([device["uid"]])
+                self.invalidate_inventory_cache()
                 return response
+            raise UnsupportedDeviceType(
+                f"Cannot delete {device.get('name')} - unsupported device type {device.get('deviceType')}"
+            )
         except DeviceNotFound as e:
             raise e
+
+    def delete_resolved(self, devices: list, concurrency: int = 10) -> dict:
+        """Delete already resolved devices in one batched pass: one working set for all of them, one cdFMC delete
+        trigger for all FTDs, and concurrent DELETEs for ASA/IOS. Devices of any other type are not touched. Return
+        a {uid: error message or None} index"""
+        errors = {
+            device["uid"]: f"Cannot delete {device.get('name')} - unsupported device type {device.get('deviceType')}"
+            for device in devices
+            if self.get_device_type(device) not in DELETE_DEVICE_TYPES
+        }
+        devices = [device for device in devices if device["uid"] not in errors]
+        if not devices:
+            return errors
+        self.working_set([device["uid"] for device in devices])
+        ftds = [device["uid"] for device in devices if self.get_device_type(device) == "ftd"]
+        others = [device["uid"] for device in devices if self.get_device_type(device) in ["asa", "ios"]]
+        if ftds:
+            try:
+                self.delete_ftds(ftds)
+                errors.update({uid: None for uid in ftds})
+            except Exception as e:
+                errors.update({uid: str(getattr(e, "message", e)) for uid in ftds})
+        responses = CDOAsyncRequests.run(
+            [
+                CDOAsyncRequests.delete(self.http_session, f"https://{self.endpoint}", f"{CDOAPI.DEVICES.value}/{uid}")
+                for uid in others
+            ],
+            concurrency=concurrency,
+            return_exceptions=True,
+        )
+        for uid, response in zip(others, responses):
+            errors[uid] = str(getattr(response, "message", response)) if isinstance(response, Exception) else None
+        self.invalidate_inventory_cache()
+        return errors
+
+    def delete_devices(self, device_names: list, concurrency: int = 10) -> list:
+        """Resolve many device names in a few batched queries and delete all the matches in one batched pass (see
+        delete_resolved). Return one result entry per name with status deleted, not_found, too_many_matches,
+        unsupported_type, or failed"""
+        results = list()
+        targets = list()
+        for device_name, device_list in self.resolve_device_names(device_names).items():
+            result = {"device_name": device_name}
+            if not device_list:
+                result["status"] = "not_found"
+            elif len(device_list) > 1:
+                result["status"] = "too_many_matches"
+                result["error"] = f"Cannot delete {device_name} - more than 1 device matches name"
+            elif self.get_device_type(device_list[0]) not in DELETE_DEVICE_TYPES:
+                result["status"] = "unsupported_type"
+                result["device_type"] = self.get_device_type(device_list[0])
+                result["error"] = (
+                    f"Cannot delete {device_name} - unsupported device type {device_list[0]['deviceType']}"
+                )
+            else:
+                result["device_uid"] = device_list[0]["uid"]
+                result["device_type"] = self.get_device_type(device_list[0])
+                targets.append(device_list[0])
+            results.append(result)
+        errors = self.delete_resolved(targets, concurrency)
+        for result in results:
+            if "device_uid" in result:
+                result["status"] = "failed" if errors[result["device_uid"]] else "deleted"
+                if errors[result["device_uid"]]:
+                    result["error"] = errors[result["device_uid"]]
+        self.changed = any(result["status"] == "deleted" for result in results)
+        return results
+
+    def delete_by_query(self, selection: dict, dry_run: bool = False, page_size: int = 50, concurrency: int = 10):
+        """Resolve every device matching the selection criteria (see CDOQuery.get_selection_query) with paginated
+        inventory queries and delete them all in one batched pass (see delete_resolved). With dry_run, only return
+        the preview: the matching devices and their counts by device type"""
+        devices = self.gather_inventory_query(CDOQuery.get_selection_query(selection), page_size)
+        preview = {
+            "dry_run": dry_run,
+            "count": len(devices),
+            "count_by_type": dict(),
+            "devices": [
+                {
+                    "device_name": device.get("name"),
+                    "device_uid": device.get("uid"),
+                    "device_type": self.get_device_type(device),
+                    "connectivity_state": device.get("connectivityState"),
+                }
+                for device in devices
+            ],
+        }
+        for device in preview["devices"]:
+            preview["count_by_type"][device["device_type"]] = preview["count_by_type"].get(device["device_type"], 0) + 1
+        if dry_run:
+            return preview
+        errors = self.delete_resolved(devices, concurrency)
+        for device in preview["devices"]:
+            if device["device_type"] not in DELETE_DEVICE_TYPES:
+                device["status"] = "unsupported_type"
+            else:
+                device["status"] = "failed" if errors[device["device_uid"]] else "deleted"
+            if errors[device["device_uid"]]:
+                device["error"] = errors[device["device_uid"]]
+        preview["deleted"] = sum(device["status"] == "deleted" for device in preview["devices"])
+        preview["failed"] = sum(device["status"] == "failed" for device in preview["devices"])
+        self.changed = preview["deleted"] > 0
+        return preview
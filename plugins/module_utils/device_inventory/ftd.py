@@ -9,32 +9,47 @@ __metaclass__ = type
 # fmt: off
 import requests
 import base64
-from time import sleep
 from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
 from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils.cache import CDOCache
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
-from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, AddDeviceFailure, DuplicateObject, ObjectNotFound
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOBatchPoller, CDOTimings
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, AddDeviceFailure, DuplicateObject, ObjectNotFound, RetriesExceeded
 # fmt: on
 
 
 class FTDInventory(Inventory):
     """Class used for CDO FTD Operations (Extends the Inventory base class in inventory.py)"""
 
-    def __init__(self, module_params: dict, http_session: requests.session, endpoint: str):
+    def __init__(
+        self,
+        module_params: dict,
+        http_session: requests.session,
+        endpoint: str,
+        cache: CDOCache = None,
+        status_source: CDOBatchPoller = None,
+    ):
         self.module_params = module_params
         self.http_session = http_session
         self.endpoint = endpoint
+        self.cache = cache
+        self.status_source = status_source
+        self.timings = CDOTimings()
         self.changed = False
 
     def new_ftd_polling(self, uid: str):
         """Check that the new FTD specific device has been created before attempting move to the onboarding step"""
-        for i in range(self.module_params.get("retry")):
+
+        def check():
             try:
                 return self.get_specific_device(uid)
             except DeviceNotFound:
-                sleep(self.module_params.get("delay"))
-                continue
-        raise AddDeviceFailure(f"Failed to add FTD {self.module_params.get('device_name')}")
+                return None
+
+        try:
+            return self.poll(check)
+        except RetriesExceeded:
+            raise AddDeviceFailure(f"Failed to add FTD {self.module_params.get('device_name')}")
 
     def update_ftd_device(self, uid: str, data: dict):
         """Update an FTD object"""
@@ -42,62 +57,80 @@ class FTDInventory(Inventory):
             self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.FTDS.value}/{uid}", data=data
         )
 
-    def add_ftd_ltp(self, ftd_device: dict, fmc_uid: str):
-        """Onboard an FTD to cdFMC using LTP (serial number onboarding)"""
-        if not self.inventory_count(filter=f"serial:{self.module_params.get('serial')}") and not self.inventory_count(
-            filter=f"name:{self.module_params.get('serial')}"
-        ):
-            ftd_device["larType"] = "CDG"
-            ftd_device["name"] = self.module_params.get("device_name")
-            ftd_device["serial"] = self.module_params.get("serial")
-            if self.module_params.get("password"):  # Set the initial admin password
-                ftd_device["sseDeviceSerialNumberRegistration"] = dict(
-                    initialProvisionData=(
-                        base64.b64encode(f'{{"nkey": "{self.module_params.get("password")}"}}'.encode("ascii")).decode(
-                            "ascii"
-                        )
-                    ),
-                    sudiSerialNumber=self.module_params.get("serial"),
-                )
-            else:  # initial password has already been set by the CLI
-                ftd_device["sseDeviceSerialNumberRegistration"] = dict(
-                    initialProvisionData=base64.b64encode('{"nkey":""}'.encode("ascii")).decode("ascii"),
-                    sudiSerialNumber=self.module_params.get("serial"),
-                )
-            ftd_device["sseEnabled"] = True
+    def ltp_device(self, ftd_device: dict) -> dict:
+        """Add the LTP (serial number onboarding) attributes to a new FTD device payload"""
+        ftd_device["larType"] = "CDG"
+        ftd_device["name"] = self.module_params.get("device_name")
+        ftd_device["serial"] = self.module_params.get("serial")
+        if self.module_params.get("password"):  # Set the initial admin password
+            ftd_device["sseDeviceSerialNumberRegistration"] = dict(
+                initialProvisionData=(
+                    base64.b64encode(f'{{"nkey": "{self.module_params.get("password")}"}}'.encode("ascii")).decode(
+                        "ascii"
+                    )
+                ),
+                sudiSerialNumber=self.module_params.get("serial"),
+            )
+        else:  # initial password has already been set by the CLI
+            ftd_device["sseDeviceSerialNumberRegistration"] = dict(
+                initialProvisionData=base64.b64encode('{"nkey":""}'.encode("ascii")).decode("ascii"),
+                sudiSerialNumber=self.module_params.get("serial"),
+            )
+        ftd_device["sseEnabled"] = True
+        return ftd_device
+
+    def create_ftd_device(self, ftd_device: dict) -> tuple:
+        """POST the new FTD device and wait for its specific device. Return both"""
+        with self.timings.phase("device_post"):
             new_ftd_device = CDORequests.post(
                 self.http_session, f"https://{self.endpoint}", path=CDOAPI.DEVICES.value, data=ftd_device
             )
+        self.invalidate_inventory_cache()
+        with self.timings.phase("specific_device_poll"):
             ftd_specific_device = self.new_ftd_polling(new_ftd_device["uid"])
-            new_ftd_device = self.get_device(new_ftd_device["uid"])
-            CDORequests.put(
-                self.http_session,
-                f"https://{self.endpoint}",
-                path=f"{CDOAPI.FTDS.value}/{ftd_specific_device['uid']}",
-                data={"queueTriggerState": "SSE_CLAIM_DEVICE"},
-            )  # Trigger device claiming
+        return new_ftd_device, ftd_specific_device
+
+    def claim_ftd_device(self, specific_device_uid: str):
+        """Trigger device claiming of an FTD onboarded by serial number"""
+        with self.timings.phase("claim_trigger"):
+            return self.update_ftd_device(specific_device_uid, {"queueTriggerState": "SSE_CLAIM_DEVICE"})
+
+    def add_ftd_ltp(self, ftd_device: dict, fmc_uid: str):
+        """Onboard an FTD to cdFMC using LTP (serial number onboarding)"""
+        with self.timings.phase("duplicate_check"):
+            duplicate = self.inventory_count(
+                filter=f"serial:{self.module_params.get('serial')}"
+            ) or self.inventory_count(filter=f"name:{self.module_params.get('serial')}")
+        if not duplicate:
+            new_ftd_device, ftd_specific_device = self.create_ftd_device(self.ltp_device(ftd_device))
+            if self.module_params.get("wait", True):
+                new_ftd_device = self.get_device(new_ftd_device["uid"])
+            self.claim_ftd_device(ftd_specific_device["uid"])
+            if not self.module_params.get("wait", True):
+                return self.onboarding_handle(new_ftd_device["uid"], ftd_specific_device["uid"], "claim")
             return new_ftd_device
 
         else:
             raise DuplicateObject(f"Device with serial number {self.module_params.get('serial')} exists in tenant")
 
-    def add_ftd(self):
-        """Add an FTD to CDO via CLI or LTP process"""
+    def build_ftd_device(self) -> dict:
+        """Look up the cdFMC, its domain, and the access policy and return the payload for a new FTD device"""
         try:
-            cdfmc = self.get_cdfmc()
-            cdfmc_specific_device = self.get_specific_device(cdfmc["uid"])
-            access_policy = self.get_cdfmc_access_policy_list(
-                cdfmc["host"],
-                cdfmc_specific_device["domainUid"],
-                access_list_name=self.module_params.get("access_control_policy"),
-            )
+            with self.timings.phase("metadata_lookup"):
+                cdfmc = self.get_cdfmc()
+                cdfmc_specific_device = self.get_cdfmc_specific_device(cdfmc["uid"])
+                access_policy = self.get_cdfmc_access_policy(
+                    cdfmc["host"],
+                    cdfmc_specific_device["domainUid"],
+                    self.module_params.get("access_control_policy"),
+                )
         except DeviceNotFound as e:
             raise e
         except ObjectNotFound as e:
             raise e
 
         # TODO: Get these from the fmc collection when it supports cdFMC
-        ftd_device = {
+        return {
             "name": self.module_params.get("device_name"),
             "associatedDeviceUid": cdfmc["uid"],
             "deviceType": "FTDC",
@@ -111,14 +144,19 @@ class FTDInventory(Inventory):
                 "performanceTier": self.module_params.get("performance_tier"),
             },
         }
+
+    def add_ftd(self):
+        """Add an FTD to CDO via CLI or LTP process. The duration and poll iterations of each phase are recorded in
+        self.timings"""
+        ftd_device = self.build_ftd_device()
         if self.module_params.get("onboard_method").lower() == "ltp":
-            return self.add_ftd_ltp(ftd_device, cdfmc["uid"])
+            return self.add_ftd_ltp(ftd_device, ftd_device["associatedDeviceUid"])
         else:
-            new_device = CDORequests.post(
-                self.http_session, f"https://{self.endpoint}", path=CDOAPI.DEVICES.value, data=ftd_device
-            )
-            specific_ftd_device = self.new_ftd_polling(new_device["uid"])
-            self.update_ftd_device(specific_ftd_device["uid"], {"queueTriggerState": "INITIATE_FTDC_ONBOARDING"})
+            new_device, specific_ftd_device = self.create_ftd_device(ftd_device)
+            with self.timings.phase("onboarding_trigger"):
+                self.update_ftd_device(specific_ftd_device["uid"], {"queueTriggerState": "INITIATE_FTDC_ONBOARDING"})
+            if not self.module_params.get("wait", True):
+                return self.onboarding_handle(new_device["uid"], specific_ftd_device["uid"], "onboarding")
             return CDORequests.get(
                 self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.DEVICES.value}/{new_device['uid']}"
             )
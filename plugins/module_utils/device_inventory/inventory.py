@@ -8,19 +8,37 @@ __metaclass__ = type
 
 from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
 from ansible_collections.cisco.cdo.plugins.module_utils.query import CDOQuery
-from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests, CDOAsyncRequests
+from ansible_collections.cisco.cdo.plugins.module_utils.cache import CDOCache, SNAPSHOT_TTL
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOPoller, CDOBatchPoller, CDOTimings
 from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, ObjectNotFound
+from concurrent.futures import ThreadPoolExecutor
 import urllib.parse
 import requests
 import uuid
 
+ONBOARDED_STATES = ["SYNCED", "NOT_SYNCED", "CONFLICT_DETECTED"]  # configState once CDO has read the device config
+# Device state refreshed for every device on each delta sync: it changes without moving the delta marker
+DELTA_STATE_FIELDS = ["uid", "connectivityState", "connectivityError", "configState", "configProcessingState", "state"]
+
 
 class Inventory:
     """Base class for CDO inventory operations"""
-    def __init__(self, module_params: dict, http_session: requests.session, endpoint: str):
+
+    def __init__(
+        self,
+        module_params: dict,
+        http_session: requests.session,
+        endpoint: str,
+        cache: CDOCache = None,
+        status_source: CDOBatchPoller = None,
+    ):
         self.module_params = module_params
         self.http_session = http_session
         self.endpoint = endpoint
+        self.cache = cache
+        self.status_source = status_source
+        self.timings = CDOTimings()
         self.changed = False
 
     def is_device_in_sync(self, device_info: dict) -> bool:
@@ -34,7 +52,32 @@ class Inventory:
         raw_uuid = uuid.uuid4().hex
         return f"{raw_uuid[0:8]}-{raw_uuid[8:12]}-{raw_uuid[12:16]}-{raw_uuid[16:20]}-{raw_uuid[20:]}"
 
+    def poll(self, check):
+        """Poll check() with a CDOPoller sized from the retry and delay options (see CDOPoller.poll) and add its
+        iterations to the current phase timings"""
+        poller = CDOPoller.from_retries(self.module_params.get("retry"), self.module_params.get("delay"))
+        try:
+            return poller.poll(check)
+        finally:
+            self.timings.record_poll(poller)
+
+    def get_tenant_metadata(self, query, loader, *args, **kwargs):
+        """Return tenant metadata that rarely changes (cdFMC, SDCs, access policies) through the cache layer so bulk
+        operations do not fetch it again for every device. Without a cache, always call the loader"""
+        if self.cache is None:
+            return loader(*args, **kwargs)
+        return self.cache.get_or_load("metadata", query, lambda: loader(*args, **kwargs), ttl=self.cache.metadata_ttl)
+
+    def refresh_tenant_metadata(self):
+        """Drop the cached tenant metadata so the next lookups go to CDO"""
+        if self.cache is not None:
+            self.cache.invalidate("metadata")
+
     def get_lar_list(self):
+        """Return a list of lars (SDC/CDG from CDO) including their public keys (tenant metadata cache)"""
+        return self.get_tenant_metadata(["lars", CDOQuery.get_lar_query(self.module_params)], self.fetch_lar_list)
+
+    def fetch_lar_list(self):
         """Return a list of lars (SDC/CDG from CDO)"""
         path = CDOAPI.LARS.value
         query = CDOQuery.get_lar_query(self.module_params)
@@ -45,7 +88,9 @@ class Inventory:
     def inventory_count(self, filter: str = None):
         """Given a filter criteria, return the number of devices that match the criteria"""
         return CDORequests.get(
-            self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.DEVICES.value}?agg=count&q={filter}"
+            self.http_session,
+            f"https://{self.endpoint}",
+            path=f"{CDOAPI.DEVICES.value}?agg=count&q={urllib.parse.quote_plus(filter)}",
         )["aggregationQueryResult"]
 
     def get_specific_device(self, uid: str) -> str:
@@ -54,10 +99,33 @@ class Inventory:
         return CDORequests.get(self.http_session, f"https://{self.endpoint}", path=path)
 
     def get_device(self, uid: str):
-        """Given a device uid, retrieve the specific device model of the device"""
+        """Given a device uid, retrieve the specific device model of the device. With a status source (a shared
+        CDOBatchPoller) the device is fetched in the next batched status query instead"""
+        if self.status_source is not None:
+            return self.status_source.get(uid)
         return CDORequests.get(self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.DEVICES.value}/{uid}")
 
+    def get_devices(self, uids: list, concurrency: int = 10) -> list:
+        """Given a list of device uids, retrieve the devices concurrently and return them in the same order"""
+        return CDOAsyncRequests.run(
+            [
+                CDOAsyncRequests.get(
+                    self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.DEVICES.value}/{uid}"
+                )
+                for uid in uids
+            ],
+            concurrency=concurrency,
+        )
+
     def get_cdfmc(self):
+        """Get the cdFMC object for this tenant if one exists (tenant metadata cache)"""
+        return self.get_tenant_metadata("cdfmc", self.fetch_cdfmc)
+
+    def get_cdfmc_specific_device(self, cdfmc_uid: str) -> dict:
+        """Get the cdFMC specific device, which holds the cdFMC domainUid (tenant metadata cache)"""
+        return self.get_tenant_metadata(["cdfmc_specific_device", cdfmc_uid], self.get_specific_device, cdfmc_uid)
+
+    def fetch_cdfmc(self):
         """Get the cdFMC object for this tenant if one exists"""
         query = CDOQuery.get_cdfmc_query()
         response = CDORequests.get(
@@ -67,23 +135,229 @@ class Inventory:
             raise DeviceNotFound("A cdFMC was not found in this tenant")
         return response[0]
 
-    def working_set(self, uid: str):
-        """Return a working set object"""
+    def working_set(self, uid: str | list):
+        """Return a working set object for one device uid or a list of them"""
+        uuids = [uid] if isinstance(uid, str) else uid
         data = {
-            "selectedModelObjects": [{"modelClassKey": "targets/devices", "uuids": [uid]}],
+            "selectedModelObjects": [{"modelClassKey": "targets/devices", "uuids": uuids}],
             "workingSetFilterAttributes": [],
         }
         return CDORequests.post(
             self.http_session, f"https://{self.endpoint}", path=f"{CDOAPI.WORKSET.value}", data=data
         )
 
-    def gather_inventory(self, limit: int = 50, offset: int = 0) -> str:
-        """Get CDO inventory"""
-        query = CDOQuery.get_inventory_query(self.module_params)
+    def get_inventory_page(self, limit: int = 50, offset: int = 0, query: dict = None) -> list:
+        """Get one page of CDO inventory"""
+        query = CDOQuery.get_inventory_query(self.module_params) if query is None else query
         q = urllib.parse.quote_plus(query["q"])
         r = urllib.parse.quote_plus(query["r"])
         path = f"{CDOAPI.DEVICES.value}?limit={limit}&offset={offset}&q={q}&resolve={r}"
-        return CDORequests.get(self.http_session, f"https://{self.endpoint}", path=path)
+        return CDORequests.get(self.http_session, f"https://{self.endpoint}", path=path) or []
+
+    def iter_inventory(self, page_size: int = 50, query: dict = None):
+        """Yield every device matching the inventory query, page by page. The next page is fetched in the background
+        while the caller works on the current one. The offset advances by the rows actually returned, so a page
+        capped below page_size by CDO does not end the gather, and paging stops at the agg=count total for the
+        query or at the first empty page"""
+        query = CDOQuery.get_inventory_query(self.module_params) if query is None else query
+        total = self.inventory_count(filter=query["q"])
+        if not total:
+            return
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            offset = 0
+            next_page = prefetch.submit(self.get_inventory_page, page_size, offset, query)
+            while next_page is not None:
+                page = next_page.result()
+                offset += len(page)
+                if page and offset < total:
+                    next_page = prefetch.submit(self.get_inventory_page, page_size, offset, query)
+                else:
+                    next_page = None
+                yield from page
+
+    def gather_inventory_parallel(self, page_size: int = 50, workers: int = 8, query: dict = None) -> list:
+        """Read the agg=count total for the query, then fetch every offset window at once with up to `workers`
+        requests in flight. A page that CDO capped below its window is completed by further rounds that fetch the
+        missing rows of each short window. Pages are stitched back together in offset order"""
+        query = CDOQuery.get_inventory_query(self.module_params) if query is None else query
+        total = self.inventory_count(filter=query["q"])
+        windows = [(offset, min(page_size, total - offset)) for offset in range(0, total, page_size)]
+        pages = dict()
+        while windows:
+            results = CDOAsyncRequests.run(
+                [CDOAsyncRequests.call(self.get_inventory_page, size, offset, query) for offset, size in windows],
+                concurrency=workers,
+            )
+            short = list()
+            for (offset, size), page in zip(windows, results):
+                pages[offset] = page
+                if page and len(page) < size:
+                    short.append((offset + len(page), size - len(page)))
+            windows = short
+        return [device for offset in sorted(pages) for device in pages[offset]]
+
+    def gather_inventory(self, page_size: int = 50, workers: int = 1) -> list:
+        """Get CDO inventory (every page), one page at a time or with `workers` pages in flight"""
+        if workers > 1:
+            return self.gather_inventory_parallel(page_size, workers)
+        return list(self.iter_inventory(page_size))
+
+    @staticmethod
+    def is_device_match(device: dict, name: str) -> bool:
+        """True if the name is the device's name (any case), ipv4 address (with or without the port), or serial"""
+        ipv4 = device.get("ipv4") or ""
+        return (device.get("name") or "").casefold() == name.casefold() or name in [
+            device.get("serial"),
+            ipv4,
+            ipv4.partition(":")[0],
+        ]
+
+    def resolve_device_names(self, names: list, chunk_size: int = 20, concurrency: int = 4) -> dict:
+        """Look up many device names, ipv4 addresses, or serial numbers with a few OR-joined inventory queries
+        (chunk_size names each) and return a {name: [matching devices]} index. Names with no match map to []"""
+        names = list(dict.fromkeys(names))
+        chunks = [names[i : i + chunk_size] for i in range(0, len(names), chunk_size)]
+        queries = [CDOQuery.get_inventory_query(self.module_params, chunk) for chunk in chunks]
+        results = CDOAsyncRequests.run(
+            [CDOAsyncRequests.call(self.gather_inventory_query, query) for query in queries], concurrency=concurrency
+        )
+        devices = [device for result in results for device in result]
+        return {name: [device for device in devices if self.is_device_match(device, name)] for name in names}
+
+    def gather_inventory_query(self, query: dict, page_size: int = 50) -> list:
+        """Get every device matching an already built inventory query"""
+        return list(self.iter_inventory(page_size, query))
+
+    def gather_cached_inventory(self, page_size: int = 50, workers: int = 1) -> list:
+        """Get CDO inventory from the on-disk cache if there is a live entry for this query, else from CDO"""
+        query = CDOQuery.get_inventory_query(self.module_params)
+        devices = self.cache.get("inventory", query) if self.cache is not None else None
+        if devices is None:
+            devices = self.gather_inventory(page_size, workers)
+            if self.cache is not None:
+                self.cache.set("inventory", query, devices)
+        return devices
+
+    def gather_delta_inventory(self, page_size: int = 50, marker_field: str = "lastDeployTimestamp") -> list:
+        """Get CDO inventory by merging only what changed since the last sync into a local snapshot.
+        The first run (or a run after the snapshot expires) is a full gather. Later runs fetch the devices whose
+        marker_field is at or after the stored sync point, then page through a cheap projection of every device (uid
+        and the DELTA_STATE_FIELDS) to drop deleted devices, fetch devices added since the snapshot, and refresh the
+        state of every device, since connectivity and config state changes do not move the marker. A summary of the
+        sync is left in self.delta_stats"""
+        query = CDOQuery.get_inventory_query(self.module_params)
+        snapshot = self.cache.get("inventory_snapshot", query, force=True)
+        if snapshot is None:
+            devices = self.gather_inventory(page_size)
+            self.delta_stats = {"full_sync": True, "changed": len(devices), "added": 0, "removed": 0}
+        else:
+            changed = self.gather_inventory_query(
+                CDOQuery.get_delta_query(query, marker_field, snapshot["marker"]), page_size
+            )
+            state_query = CDOQuery.get_inventory_query({**self.module_params, "fields": DELTA_STATE_FIELDS})
+            states = {device["uid"]: device for device in self.iter_inventory(max(page_size, 200), state_query)}
+            devices = {device["uid"]: device for device in snapshot["devices"]}
+            devices.update({device["uid"]: device for device in changed})
+            added = [uid for uid in states if uid not in devices]
+            devices.update({device["uid"]: device for device in self.get_devices(added)})
+            removed = len(devices) - len(states)
+            devices = [devices[uid] for uid in states if uid in devices]
+            refreshed = 0
+            for device in devices:
+                state = {field: states[device["uid"]].get(field) for field in DELTA_STATE_FIELDS}
+                if any(device.get(field) != value for field, value in state.items()):
+                    device.update(state)
+                    refreshed += 1
+            self.delta_stats = {
+                "full_sync": False,
+                "changed": len(changed),
+                "added": len(added),
+                "removed": removed,
+                "refreshed": refreshed,
+            }
+        markers = [device.get(marker_field) for device in devices if isinstance(device.get(marker_field), (int, float))]
+        self.cache.set(
+            "inventory_snapshot",
+            query,
+            {"marker": max(markers, default=0), "devices": devices},
+            ttl=SNAPSHOT_TTL,
+            force=True,
+        )
+        return devices
+
+    def onboarding_handle(self, device_uid: str, specific_device_uid: str = None, phase: str = None) -> dict:
+        """Return the handle for a device onboarded with wait=false. Check it later with get_onboarding_status"""
+        return {
+            "device_uid": device_uid,
+            "specific_device_uid": specific_device_uid,
+            "device_name": self.module_params.get("device_name"),
+            "device_type": self.module_params.get("device_type", "ftd"),
+            "phase": phase,
+        }
+
+    def get_onboarding_status(self, handles: list) -> list:
+        """Given onboarding handles (see onboarding_handle), fetch every device in one batched uid query (per 50
+        handles) and return each handle with its current phase: onboarded, failed, not_found, or the pending phase it
+        was handed off in. done is true once the phase will not change any more"""
+        devices = CDOBatchPoller(self.http_session, self.endpoint).fetch([handle["device_uid"] for handle in handles])
+        statuses = list()
+        for handle in handles:
+            status = dict(handle, done=True)
+            device = devices.get(handle["device_uid"])
+            if device is None:
+                status["phase"] = "not_found"
+            else:
+                status["connectivity_state"] = device.get("connectivityState")
+                status["config_state"] = device.get("configState")
+                if (
+                    device.get("connectivityError")
+                    and device.get("connectivityState") not in (None, -5)
+                    and int(device.get("connectivityState")) < 0
+                ):
+                    status["phase"] = "failed"
+                    status["error"] = device.get("connectivityError")
+                elif int(device.get("connectivityState") or 0) > 0 and device.get("configState") in ONBOARDED_STATES:
+                    status["phase"] = "onboarded"
+                else:
+                    status["done"] = False
+            statuses.append(status)
+        return statuses
+
+    def invalidate_inventory_cache(self):
+        """Called after we add or delete devices so that cached inventory reads never go stale"""
+        if self.cache is not None:
+            self.cache.invalidate("inventory")
+
+    def get_cdfmc_access_policy(self, cdfmc_host: str, domain_uid: str, access_list_name: str):
+        """Given an access policy name, return the access policy list response for it. The name is looked up in the
+        index of every access policy on the cdFMC (tenant metadata cache) and only queried directly if it is missing
+        from the index, e.g. a policy created after the index was cached"""
+        index = self.get_cdfmc_access_policy_index(cdfmc_host, domain_uid)
+        if access_list_name in index:
+            return {"items": [{"name": access_list_name, "id": index[access_list_name]}]}
+        return self.get_cdfmc_access_policy_list(cdfmc_host, domain_uid, access_list_name=access_list_name)
+
+    def get_cdfmc_access_policy_index(self, cdfmc_host: str, domain_uid: str, page_size: int = 100) -> dict:
+        """Return a {name: id} index of every access policy on the cdFMC (tenant metadata cache)"""
+        return self.get_tenant_metadata(
+            ["access_policy_index", domain_uid],
+            self.fetch_cdfmc_access_policy_index,
+            cdfmc_host,
+            domain_uid,
+            page_size,
+        )
+
+    def fetch_cdfmc_access_policy_index(self, cdfmc_host: str, domain_uid: str, page_size: int = 100) -> dict:
+        """Page through every access policy on the cdFMC and return a {name: id} index"""
+        index = dict()
+        offset = 0
+        while True:
+            response = self.get_cdfmc_access_policy_list(cdfmc_host, domain_uid, limit=page_size, offset=offset)
+            for access_policy in response.get("items", []):
+                index[access_policy["name"]] = access_policy["id"]
+            offset += page_size
+            if offset >= response["paging"]["count"] or not response.get("items"):
+                return index
 
     def get_cdfmc_access_policy_list(
         self,
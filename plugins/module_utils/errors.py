@@ -89,3 +89,9 @@ class DeviceNotInSync(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class UnsupportedDeviceType(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
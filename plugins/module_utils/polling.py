@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+# Apache License v2.0+ (see LICENSE or https://www.apache.org/licenses/LICENSE-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import requests
+import threading
+import time
+from contextlib import contextmanager
+from ansible_collections.cisco.cdo.plugins.module_utils.api_endpoints import CDOAPI
+from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORequests
+from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, RetriesExceeded
+
+
+class CDOPoller:
+    """Poll a CDO state machine until it reaches a terminal state or the phase deadline passes.
+    The first check is made immediately. The wait between checks starts at `interval` and grows by `backoff` up to
+    `max_interval`, so operations that finish quickly are seen quickly and slow ones cost fewer API calls. The poll
+    gives up only once the deadline has passed and at least `min_attempts` checks have been made.
+    Example:
+        device = CDOPoller.from_retries(retry, delay).poll(lambda: check_device(uid), "Device never came up")
+    """
+
+    MIN_INTERVAL = 0.25
+    BACKOFF = 2.0
+
+    def __init__(
+        self,
+        timeout: float,
+        interval: float = MIN_INTERVAL,
+        max_interval: float = None,
+        backoff: float = BACKOFF,
+        min_attempts: int = 1,
+    ):
+        self.timeout = timeout
+        self.interval = interval
+        self.max_interval = max_interval if max_interval is not None else max(interval, timeout / 4)
+        self.backoff = backoff
+        self.min_attempts = min_attempts
+        self.attempts = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    def from_retries(cls, retries: int, delay: float):
+        """Build a poller from the retry/delay style module options. The phase deadline is the time the fixed-interval
+        loop would have waited (retries x delay), the wait between checks never grows beyond 4 x delay, and at least
+        `retries` checks are made however long each one takes"""
+        return cls(retries * delay, interval=min(delay, cls.MIN_INTERVAL), max_interval=4 * delay, min_attempts=retries)
+
+    def poll(self, check, message: str = "Timed out waiting for CDO"):
+        """Call check() until it returns something other than None and return that. check() may raise to end the
+        poll early on a failed terminal state. Raise RetriesExceeded once the deadline has passed and at least
+        min_attempts checks have been made"""
+        start = time.monotonic()
+        interval = self.interval
+        while True:
+            self.attempts += 1
+            result = check()
+            self.elapsed = time.monotonic() - start
+            if result is not None:
+                return result
+            remaining = self.timeout - self.elapsed
+            if remaining <= 0 and self.attempts >= self.min_attempts:
+                raise RetriesExceeded(message)
+            time.sleep(min(interval, remaining) if remaining > 0 else interval)
+            interval = min(interval * self.backoff, self.max_interval)
+
+
+class CDOTimings:
+    """Start time (epoch seconds), duration, and poll iterations of each phase of a multi-step operation such as
+    onboarding, in the order the phases ran. Returned to the playbook as `timings` so it can be aggregated across
+    a fleet.
+    Example:
+        with self.timings.phase("connectivity_poll"):
+            self.connectivity_poll(uid)  # pollers report their iterations with record_poll
+    """
+
+    def __init__(self):
+        self.phases = list()
+
+    @contextmanager
+    def phase(self, name: str):
+        entry = {"phase": name, "start": round(time.time(), 3), "duration": None, "poll_iterations": 0}
+        self.phases.append(entry)
+        begin = time.monotonic()
+        try:
+            yield entry
+        except Exception:
+            entry["failed"] = True
+            raise
+        finally:
+            entry["duration"] = round(time.monotonic() - begin, 3)
+
+    def record_poll(self, poller: CDOPoller):
+        """Add the iterations of a finished (or exhausted) poller to the current phase"""
+        if self.phases:
+            self.phases[-1]["poll_iterations"] += poller.attempts
+
+
+class CDOBatchPoller:
+    """Shared status source for many concurrent operations (e.g. bulk onboarding). Callers block in get(uid) while a
+    single ticker thread fetches the state of every outstanding uid in one q=uid:(a OR b OR ...) query per tick and
+    hands each caller its record, so polling traffic grows with the number of ticks, not ticks x devices.
+    `path` is any CDO collection that can be queried by `field`, e.g. CDOAPI.DEVICES or CDOAPI.JOBS by uid, or
+    CDOAPI.CLI_EXECUTIONS by transactionId.
+    Example:
+        status_source = CDOBatchPoller(http_session, endpoint)
+        client = ASA_IOS_Inventory(module_params, http_session, endpoint, cache, status_source)  # get_device batched
+    """
+
+    TICK = 0.5
+
+    def __init__(
+        self,
+        http_session: requests.session,
+        endpoint: str,
+        path: str = CDOAPI.DEVICES.value,
+        field: str = "uid",
+        tick: float = TICK,
+        chunk_size: int = 50,
+    ):
+        self.http_session = http_session
+        self.endpoint = endpoint
+        self.path = path
+        self.field = field
+        self.tick = tick
+        self.chunk_size = chunk_size
+        self.condition = threading.Condition()
+        self.waiting = dict()  # uid: number of callers waiting for it
+        self.results = dict()  # uid: (tick number, record or exception)
+        self.ticks = 0
+        self.requests = 0
+        self.thread = None
+
+    def get(self, uid: str) -> dict:
+        """Block until a tick that started after this call has fetched the uid (or transaction id) and return its
+        record"""
+        with self.condition:
+            self.waiting[uid] = self.waiting.get(uid, 0) + 1
+            started = self.ticks
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            while self.results.get(uid, (-1, None))[0] <= started:
+                self.condition.wait()
+            self.waiting[uid] -= 1
+            if not self.waiting[uid]:
+                del self.waiting[uid]
+            record = self.results[uid][1]
+        if isinstance(record, Exception):
+            raise record
+        return record
+
+    def fetch(self, uids: list) -> dict:
+        """Fetch the records for the given uids in as few queries as possible and return a {uid: record} index"""
+        records = dict()
+        for i in range(0, len(uids), self.chunk_size):
+            chunk = uids[i : i + self.chunk_size]
+            response = CDORequests.get(
+                self.http_session,
+                f"https://{self.endpoint}",
+                path=self.path,
+                query={"q": f"{self.field}:({' OR '.join(chunk)})", "limit": len(chunk)},
+            )
+            self.requests += 1
+            records.update({record[self.field]: record for record in response or []})  # get() returns None for []
+        return records
+
+    def run(self):
+        """Ticker thread: one batched fetch per tick for as long as anybody is waiting"""
+        while True:
+            with self.condition:
+                if not self.waiting:
+                    self.thread = None
+                    return
+                self.ticks += 1
+                tick = self.ticks
+                uids = list(self.waiting)
+            try:
+                records = self.fetch(uids)
+                results = {uid: records.get(uid, DeviceNotFound(f"{uid} was not found in {self.path}")) for uid in uids}
+            except Exception as e:
+                results = {uid: e for uid in uids}
+            with self.condition:
+                self.results.update({uid: (tick, result) for uid, result in results.items()})
+                self.condition.notify_all()
+            time.sleep(self.tick)
@@ -8,23 +8,35 @@ __metaclass__ = type
 
 import urllib.parse
 
+# Device attributes resolved by a full inventory query
+INVENTORY_FIELDS = (
+    "name,customLinks,healthStatus,sseDeviceRegistrationToken,sseDeviceSerialNumberRegistration,sseEnabled,"
+    "sseDeviceData,state,ignoreCertificate,deviceType,configState,configProcessingState,model,ipv4,modelNumber,serial,"
+    "chassisSerial,hasFirepower,connectivityState,connectivityError,certificate,mostRecentCertificate,tags,tagKeys,"
+    "type,associatedDeviceUid,oobDetectionState,enableOobDetection,deviceActivity,softwareVersion,autoAcceptOobEnabled,"
+    "oobCheckInterval,larUid,larType,metadata,fmcApplianceIpv4,lastDeployTimestamp"
+).split(",")
+# Always resolved, even when the caller asks for a subset of fields (needed to identify and normalize a device)
+INVENTORY_REQUIRED_FIELDS = ["name", "deviceType"]
+
 
 class CDOQuery:
     """Helpers for building complex inventory queries"""
 
     @staticmethod
-    def get_inventory_query(module_params: dict) -> dict:
-        """Build the inventory query based on what the user is looking for"""
+    def get_inventory_fields(fields: list = None) -> list:
+        """Return the device attributes to resolve: every attribute, or just the requested ones plus the required"""
+        if not fields:
+            return INVENTORY_FIELDS
+        return INVENTORY_REQUIRED_FIELDS + [f for f in dict.fromkeys(fields) if f not in INVENTORY_REQUIRED_FIELDS]
+
+    @staticmethod
+    def get_inventory_query(module_params: dict, names: list = None) -> dict:
+        """Build the inventory query based on what the user is looking for. If a list of names is given, match any
+        device whose name, ipv4, or serial is one of them instead of the single filter"""
         device_type = module_params.get("device_type")
         filter = module_params.get("filter")
-        r = (
-            "[targets/devices.{name,customLinks,healthStatus,sseDeviceRegistrationToken,"
-            "sseDeviceSerialNumberRegistration,sseEnabled,sseDeviceData,state,ignoreCertificate,deviceType,"
-            "configState,configProcessingState,model,ipv4,modelNumber,serial,chassisSerial,hasFirepower,"
-            "connectivityState,connectivityError,certificate,mostRecentCertificate,tags,tagKeys,type,"
-            "associatedDeviceUid,oobDetectionState,enableOobDetection,deviceActivity,softwareVersion,"
-            "autoAcceptOobEnabled,oobCheckInterval,larUid,larType,metadata,fmcApplianceIpv4,lastDeployTimestamp}]"
-        )
+        r = f"[targets/devices.{{{','.join(CDOQuery.get_inventory_fields(module_params.get('fields')))}}}]"
 
         # Build q query
         if device_type is None or device_type == "all":
@@ -38,7 +50,10 @@ class CDOQuery:
             )
         elif device_type == "fmc":
             q = "deviceType:FMC OR deviceType:FMCE"
-        if filter:
+        if names:
+            names_q = " OR ".join(f"(name:{name}) OR (ipv4:{name}) OR (serial:{name})" for name in names)
+            q = q.replace("(model:false)", f"(model:false) AND ({names_q})")
+        elif filter:
             q = q.replace(
                 "(model:false)", f"(model:false) AND ((name:{filter}) OR (ipv4:{filter}) OR (serial:{filter}))"
             )
@@ -48,6 +63,31 @@ class CDOQuery:
         #    r = r[0:-1] + ",meraki/mxs.{status,state,physicalDevices,boundDevices,network}" + r[-1:]
         return {"q": q, "r": r}
 
+    @staticmethod
+    def get_selection_query(selection: dict) -> dict:
+        """Build a query for every device matching all of the given criteria: a name pattern (* wildcards), tags
+        ({key: value}, use the key labels for plain labels), a device type, a connectivity state, and a config state.
+        Only the attributes needed to act on the devices are resolved. The cdFMC itself is never selected"""
+        q = ["(model:false)", "(NOT deviceType:FMCE)"]
+        if selection.get("name"):
+            q.append(f"(name:{selection.get('name')})")
+        for key, value in (selection.get("tags") or {}).items():
+            q.append(f'(tags.{key}:"{value}")')
+        if selection.get("device_type") == "ftd":
+            q.append("((deviceType:FTDC) OR (deviceType:FMC_MANAGED_DEVICE))")
+        elif selection.get("device_type"):
+            q.append(f"(deviceType:{selection.get('device_type').upper()})")
+        if selection.get("connectivity_state") is not None:
+            q.append(f"(connectivityState:{selection.get('connectivity_state')})")
+        if selection.get("config_state"):
+            q.append(f"(configState:{selection.get('config_state')})")
+        return {"q": " AND ".join(q), "r": "[targets/devices.{name,deviceType,connectivityState,configState,tags}]"}
+
+    @staticmethod
+    def get_delta_query(query: dict, marker_field: str, marker) -> dict:
+        """Narrow an inventory query to the devices whose marker field is at or after the last sync point"""
+        return {"q": f"({query['q']}) AND ({marker_field}:[{marker} TO *])", "r": query["r"]}
+
     @staticmethod
     def get_lar_query(module_params: dict) -> str | None:
         """return a query to retrieve the SDC details"""
@@ -84,16 +124,27 @@ class CDOQuery:
 
     @staticmethod
     def pending_changes_query(module_params: dict, agg: bool = False) -> dict:
+        """Return a query for the staged changes of the named device (a * wildcard pattern matches many devices), or
+        of every ASA/IOS device in the tenant when no device name is given"""
         q = (
-            f"device.name:{module_params.get('device_name')} AND device.configState:NOT_SYNCED AND device.model:false"
+            "device.configState:NOT_SYNCED AND device.model:false"
             " AND NOT device.deviceType:FTDC AND NOT device.deviceType:FMC_MANAGED_DEVICE"
         )
+        if module_params.get("device_name"):
+            q = f"device.name:{module_params.get('device_name')} AND {q}"
         r = "[targets/device-changelog.{changeLogInstance}]"
         if agg:
             return {"agg": "count", "q": q, "resolve": r}
         else:
             return {"limit": module_params.get("limit"), "offset": module_params.get("offset"), "q": q, "resolve": r}
 
+    @staticmethod
+    def pending_changes_devices_query(module_params: dict, limit: int, offset: int) -> dict:
+        """Return a page of the pending changes query that resolves only the device each change belongs to, not the
+        change itself"""
+        query = CDOQuery.pending_changes_query(module_params)
+        return {**query, "limit": limit, "offset": offset, "resolve": "[targets/device-changelog.{uid,device}]"}
+
     @staticmethod
     def pending_changes_diff_query(uid: str) -> dict:
         """Given a UID of an Object Reference, generate a query to return the diff details of the config"""
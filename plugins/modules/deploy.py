@@ -30,6 +30,28 @@ options:
       - eu
       - apj
     default: us
+  api_retry:
+    description: >-
+      How to retry API calls that CDO throttles (HTTP 429) or that fail with a transient error (HTTP 502, 503, 504 or
+      a dropped connection). Throttled calls are retried for every verb; other transient failures are only retried for
+      GET, PUT, and DELETE. A Retry-After header from CDO is always honoured. The number of retries and the total
+      back-off time are returned in C(retry_stats).
+    type: dict
+    suboptions:
+      retries:
+        description: The maximum number of times to retry a single API call. Set to 0 to disable retries.
+        type: int
+        default: 5
+      backoff_factor:
+        description: >-
+          Base for the exponential back-off in seconds. Before retry N we wait a random time between 0 and
+          backoff_factor x 2^N seconds (full jitter).
+        type: float
+        default: 0.5
+      backoff_max:
+        description: The longest time in seconds to wait between two attempts when CDO did not send Retry-After
+        type: float
+        default: 30
   deploy:
     description: Deploy pending configs (Changes staged in CDO) to running devices
     type: dict
@@ -47,12 +69,57 @@ options:
       device_name:
         description: The CDO inventory name of the device in which we wish to deploy
         type: str
-        required: true
+      device_names:
+        description: >-
+          Deploy many devices at once. The names are resolved in a few batched inventory queries and the devices with
+          pending changes are deployed in shared jobs of C(batch_size) devices that are polled together. Every other
+          name is reported in C(skipped) with a reason of not_found, too_many_matches, no_pending_changes, or
+          deployed_by_cdfmc. If CDO rejects a job, its devices are reported as failed and the other jobs still run.
+        type: list
+        elements: str
+      query:
+        description: >-
+          Deploy every device with pending changes that matches all of the given criteria, in shared jobs like
+          C(device_names). FTD changes are deployed by the cdFMC, so FTDs are reported in C(skipped).
+        type: dict
+        suboptions:
+          name:
+            description: A device name or name pattern with * wildcards, e.g. branch-*
+            type: str
+          tags:
+            description: >-
+              Tags the devices must have, as {key: value}. Use the key labels for plain (ungrouped) tags.
+            type: dict
+          device_type:
+            description: Only select devices of this type
+            type: str
+            choices:
+              - asa
+              - ios
+      batch_size:
+        description: The maximum number of devices in one deploy job when deploying C(device_names) or C(query)
+        type: int
+        default: 50
+      wave_size:
+        description: >-
+          Roll the deploy of C(device_names) or C(query) out in waves of this many devices. Each wave is deployed and
+          polled to completion before the next one starts. The timing and throughput of every wave are returned in
+          C(waves).
+        type: int
+      wave_percent:
+        description: Like C(wave_size), but each wave is this percentage of the selected devices (at least one device)
+        type: int
+      failure_budget:
+        description: >-
+          Stop the rollout once more than this many devices have failed or timed out. The devices of the waves that
+          were not started are reported with status not_started. If omitted, every wave is started.
+        type: int
       timeout:
         description: >-
-          When polling for the deploy to complete, poll this many times.
-          The total time before we assume something has gone wrong will be
-          the timeout x interval (below)
+          When polling for the deploy to complete, check at least this many
+          times, and for at least timeout x interval (below) seconds, before
+          we assume something has gone wrong. The first checks come quickly
+          and the wait between checks grows up to 4 x interval.
         type: int
         default: 10
       interval:
@@ -78,11 +145,22 @@ options:
           - all
         default: all
       device_name:
-        description: The CDO inventory name of the device in which we wish to deploy
+        description: >-
+          The CDO inventory name of the device for which to get the pending configs. Required unless C(summary) is
+          set, in which case it may be a pattern with * wildcards, or omitted to summarize the whole tenant.
         type: str
-        required: true
+      summary:
+        description: >-
+          Do not return the staged changes themselves. Return the number of pending changes, the devices that
+          have them with the number of pending changes of each device, and a device count per device type. Only
+          the device of each change is queried, never the change bodies, so deploy decisions for a large tenant
+          cost a few API calls.
+        type: bool
+        default: false
       limit:
-        description: The number of devices for which to retrieve changes in 1 API call
+        description: >-
+          The number of devices for which to retrieve changes in 1 API call. With C(summary), the number of changes
+          and of devices to request per page.
         type: int
         default: 50
       offset:
@@ -115,6 +193,45 @@ EXAMPLES = r"""
           device_name: "{{ inventory_hostname }}"
           timeout: 20
           interval: 2
+
+- name: Deploy the branch fleet in one window
+  hosts: localhost
+  connection: local
+  tasks:
+    - name: Find the branch devices that need a deploy
+      cisco.cdo.deploy:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        pending:
+          device_name: branch-*
+          summary: true
+      register: pending_summary
+
+    - name: Deploy every branch ASA with pending changes
+      cisco.cdo.deploy:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        deploy:
+          query:
+            name: branch-*
+            device_type: asa
+          batch_size: 25
+          timeout: 60
+          interval: 5
+      when: pending_summary.cdo.device_count > 0
+
+    - name: Roll changes out to every ASA in 10% waves, stopping after 3 failures
+      cisco.cdo.deploy:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        deploy:
+          query:
+            device_type: asa
+          wave_percent: 10
+          failure_budget: 3
+          timeout: 60
+          interval: 5
+      register: rollout
 """
 
 # fmt: off
@@ -125,7 +242,9 @@ from ansible_collections.cisco.cdo.plugins.module_utils.args_common import (
     DEPLOY_ARGUMENT_SPEC,
     DEPLOY_MUTUALLY_REQUIRED_ONE_OF,
     DEPLOY_MUTUALLY_EXCLUSIVE,
-    DEPLOY_REQUIRED_IF
+    DEPLOY_REQUIRED_IF,
+    DEPLOY_POSITIVE_OPTIONS,
+    check_positive_options,
 )
 from ansible_collections.cisco.cdo.plugins.module_utils.errors import DeviceNotFound, TooManyMatches, APIError, CredentialsFailure
 from ansible.module_utils.basic import AnsibleModule
@@ -144,16 +263,26 @@ def main():
         mutually_exclusive=DEPLOY_MUTUALLY_EXCLUSIVE,
         required_if=DEPLOY_REQUIRED_IF,
     )
+    error = check_positive_options(module.params, DEPLOY_POSITIVE_OPTIONS)
+    if error:
+        module.fail_json(msg=error)
     endpoint = CDORegions[module.params.get("region")].value
-    http_session = CDORequests.create_session(module.params.get("api_key"), __version__)
+    http_session = CDORequests.create_session(
+        module.params.get("api_key"), __version__, module._socket_path, module.params.get("api_retry")
+    )
 
     # Deploy pending configuration changes to specific device
     if module.params.get("deploy"):
         try:
             deploy_client = Deploy(module.params.get("deploy"), http_session, endpoint)
-            result["cdo"] = deploy_client.deploy_changes()
-            if result["cdo"]:
-                result["changed"] = True
+            if module.params.get("deploy").get("device_name"):
+                result["cdo"] = deploy_client.deploy_changes()
+                if result["cdo"]:
+                    result["changed"] = True
+            else:  # Deploy every selected device with pending changes in a few shared jobs
+                result["cdo"] = deploy_client.deploy_many()
+                result["changed"] = deploy_client.changed
+                result["failed"] = bool(result["cdo"].get("failed"))
         except DeviceNotFound as e:
             result["cdo"] = f"Device not found: {e.message}"
             result["changed"] = False
@@ -165,7 +294,10 @@ def main():
     if module.params.get("pending"):
         try:
             deploy_client = Deploy(module.params.get("pending"), http_session, endpoint)
-            result["cdo"] = deploy_client.get_pending_deploy()
+            if module.params.get("pending").get("summary"):
+                result["cdo"] = deploy_client.get_pending_summary()
+            else:
+                result["cdo"] = deploy_client.get_pending_deploy()
         except DeviceNotFound as e:
             result["cdo"] = f"Device not found: {e.message}"
             result["changed"] = False
@@ -173,6 +305,7 @@ def main():
         except (APIError, CredentialsFailure) as e:
             result["stderr"] = f"ERROR: {e.message}"
 
+    result["retry_stats"] = http_session.retry_policy.stats()
     module.exit_json(**result)
 
 
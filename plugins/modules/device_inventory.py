@@ -32,6 +32,58 @@ options:
       - eu
       - apj
     default: us
+  api_retry:
+    description: >-
+      How to retry API calls that CDO throttles (HTTP 429) or that fail with a transient error (HTTP 502, 503, 504 or
+      a dropped connection). Throttled calls are retried for every verb; other transient failures are only retried for
+      GET, PUT, and DELETE. A Retry-After header from CDO is always honoured. The number of retries and the total
+      back-off time are returned in C(retry_stats).
+    type: dict
+    suboptions:
+      retries:
+        description: The maximum number of times to retry a single API call. Set to 0 to disable retries.
+        type: int
+        default: 5
+      backoff_factor:
+        description: >-
+          Base for the exponential back-off in seconds. Before retry N we wait a random time between 0 and
+          backoff_factor x 2^N seconds (full jitter).
+        type: float
+        default: 0.5
+      backoff_max:
+        description: The longest time in seconds to wait between two attempts when CDO did not send Retry-After
+        type: float
+        default: 30
+  cache:
+    description: >-
+      Share gathered inventory between tasks and forks through an SQLite file on the controller. Entries are keyed by
+      tenant, region, and inventory query, and expire after C(ttl) seconds. Adding or deleting devices with this
+      module always clears the cached inventory for the tenant, even when C(enabled) is false.
+    type: dict
+    suboptions:
+      enabled:
+        description: Read and store gather results in the cache
+        type: bool
+        default: false
+      ttl:
+        description: The number of seconds a cached inventory remains valid
+        type: int
+        default: 300
+      path:
+        description: The cache database file. It is created readable by the owner only.
+        type: path
+        default: ~/.ansible/tmp/cisco_cdo_cache.sqlite
+      metadata_ttl:
+        description: >-
+          The number of seconds cached tenant metadata (cdFMC identity and domain, SDCs and their public keys, the
+          index of cdFMC access policies by name) remains valid. Within a single task this metadata is always looked
+          up only once.
+        type: int
+        default: 3600
+      refresh_metadata:
+        description: Ignore cached tenant metadata and fetch it again from CDO (the fresh values are cached)
+        type: bool
+        default: false
   gather:
     description: >-
       This option gathers inventory information from CDO and returns things like
@@ -51,8 +103,58 @@ options:
           - ftd
           - fmc
         default: all
+      page_size:
+        description: >-
+          The number of devices to request per API call. The whole inventory is always returned; the next page is
+          requested while the current page is being processed.
+        type: int
+        default: 50
+      workers:
+        description: >-
+          When greater than 1, read the device count first and then request all of the pages at once with this many
+          API calls in flight. Results are returned in the same order as a sequential gather. Use this for large
+          tenants.
+        type: int
+        default: 1
+      fields:
+        description: >-
+          Only resolve and return these device attributes (e.g. name, uid, configState, connectivityState) instead of
+          the full device model. Smaller responses are faster to download and decode on large tenants.
+        type: list
+        elements: str
+      delta:
+        description: >-
+          Incremental sync. Keep a snapshot of the inventory in the cache file (see cache.path, whether or not the
+          cache is enabled) and on later runs only download the devices that changed since the last sync
+          (delta_marker), plus a listing of every device's uid, name, type, and connectivity and config state to
+          drop deleted devices, pick up new ones, and refresh the state of the others. The first run and any run after
+          30 days is a full gather. A summary is returned in C(delta).
+        type: bool
+        default: false
+      delta_marker:
+        description: >-
+          The device attribute that records the last change, used as the sync point. The default,
+          lastDeployTimestamp, only moves when changes are deployed, and devices that have never been deployed have
+          no marker. Connectivity and config state are refreshed on every sync regardless, but other attributes of
+          such devices (e.g. softwareVersion or tags) are only refreshed by a full gather; set C(delta) to false or
+          clear the cache to force one.
+        type: str
+        default: lastDeployTimestamp
+      output_format:
+        description: >-
+          C(list) returns a list with one dictionary per device. C(columnar) returns the field names once in
+          C(fields) and one list of values per device in C(rows), which is much smaller for large tenants.
+        type: str
+        choices:
+          - list
+          - columnar
+        default: list
   add:
-    description: 'This option onboards an FTD, ASA, or IOS device to be managed by CDO'
+    description: >-
+      This option onboards an FTD, ASA, or IOS device to be managed by CDO. The start time (epoch seconds), duration,
+      and number of poll iterations of every onboarding phase (metadata_lookup, duplicate_check, device_post,
+      connectivity_poll, specific_device_poll, credentials_put, credentials_poll, onboarding_trigger, claim_trigger)
+      are returned in C(timings), or per device in C(cdo) for ftd_devices and asa_ios_devices.
     type: dict
     options:
       ftd:
@@ -129,6 +231,13 @@ options:
               logged into we must provide a new admin password. Note that this
               needs to meet password complexity requirements.
             type: str
+          wait:
+            description: >-
+              Wait for the device to finish onboarding. If false, return as soon as the onboarding has been handed off
+              to CDO (after the onboarding or claim trigger) with a handle (device_uid, specific_device_uid, phase)
+              that can be checked later with C(status).
+            type: bool
+            default: true
       asa_ios:
         description: Define an FTD device to onboard
         type: dict
@@ -187,6 +296,174 @@ options:
             description: The amount of time to wait before retrying (See retry above)
             type: int
             default: 1
+          wait:
+            description: >-
+              Wait for CDO to accept the device credentials. If false, return as soon as the credentials have been
+              sent with a handle (device_uid, specific_device_uid, phase) that can be checked later with C(status).
+            type: bool
+            default: true
+      ftd_devices:
+        description: >-
+          A list of FTD devices to onboard in one task. Each entry takes the same options as C(ftd). Devices are
+          onboarded concurrently (see C(concurrency)) and a failure of one device does not stop the others. FTDs
+          onboarded by serial number (onboard_method ltp) are checked for duplicates together in a few queries, then
+          created concurrently, then claimed in one pass. A serial number given more than once is only onboarded for
+          its first entry. Their results include the serial number.
+        type: list
+        elements: dict
+        options:
+          device_name:
+            description: Add a device to CDO and give it this display name
+            type: str
+            required: true
+          onboard_method:
+            description: Onboard the FTD using the traditional CLI or via LTP
+            type: str
+            choices:
+              - ltp
+              - cli
+            default: cli
+          access_control_policy:
+            description: >-
+              The access-control-policy from FMC to apply to the device at the
+              time of onboarding
+            type: str
+            default: Default Access Control Policy
+          is_virtual:
+            description: 'If this is a virtual FTD, set this to true'
+            default: false
+            type: bool
+          license:
+            description: >-
+              Provide a list of license entitlements to apply to the device. Can
+              be changed later.
+            type: list
+            elements: str
+            choices:
+              - BASE
+              - THREAT
+              - URLFilter
+              - MALWARE
+              - CARRIER
+              - PLUS
+              - APEX
+              - VPNOnly
+            default:
+              - BASE
+          performance_tier:
+            description: 'If this is an FTDv, select a performance tier'
+            type: str
+            choices:
+              - FTDv
+              - FTDv5
+              - FTDv10
+              - FTDv20
+              - FTDv30
+              - FTDv50
+              - FTDv100
+          retry:
+            description: >-
+              While waiting for the device to be added to CDO, retry this many
+              times before giving up and failing.
+            type: int
+            default: 10
+          delay:
+            description: The amount of time to wait before retrying (See retry above)
+            type: int
+            default: 1
+          serial:
+            description: >-
+              If the LTP onboarding method is used, we must provide a serial
+              number
+            type: str
+          password:
+            description: >-
+              If the LTP onboarding method is used and the device has never been
+              logged into we must provide a new admin password. Note that this
+              needs to meet password complexity requirements.
+            type: str
+          wait:
+            description: >-
+              Wait for the device to finish onboarding. If false, return as soon as the onboarding has been handed off
+              to CDO (after the onboarding or claim trigger) with a handle (device_uid, specific_device_uid, phase)
+              that can be checked later with C(status).
+            type: bool
+            default: true
+      asa_ios_devices:
+        description: >-
+          A list of ASA or IOS devices to onboard in one task. Each entry takes the same options as C(asa_ios).
+          Devices are onboarded concurrently (see C(concurrency)) and a failure of one device does not stop the others.
+        type: list
+        elements: dict
+        options:
+          device_name:
+            description: Add a device to CDO and give it this display name
+            type: str
+            required: true
+          ipv4:
+            description: >-
+              The ip address that the SDC will use to communicate with the SDC.
+              Usually the management interface ip address.
+            type: str
+            required: true
+          mgmt_port:
+            description: >-
+              The TCP port on which the ASDM interface on the ASA listens. 443
+              is the default.
+            type: int
+            default: 443
+          sdc:
+            description: >-
+              The exact name of the SDC that will communicate with this ASA.
+              This name can be found in CDO under Tools & Services --> Secure
+              Connectors
+            type: str
+            required: true
+          username:
+            description: The admin username used to log into the ASA
+            type: str
+            required: true
+          password:
+            description: The admin password for the above username used to log into the ASA
+            type: str
+            required: true
+          ignore_cert:
+            description: >-
+              If the ASA ASDM interface has an expired, self-signed, or invalid
+              certificate, onboard it anyway (RISK!)
+            type: bool
+            default: false
+          device_type:
+            description: 'The type of device to onboard, an ASA or an IOS device'
+            type: str
+            choices:
+              - asa
+              - ios
+            default: asa
+          retry:
+            description: >-
+              While waiting for the device to be added to CDO, retry this many
+              times before giving up and failing.
+            type: int
+            default: 10
+          delay:
+            description: The amount of time to wait before retrying (See retry above)
+            type: int
+            default: 1
+          wait:
+            description: >-
+              Wait for CDO to accept the device credentials. If false, return as soon as the credentials have been
+              sent with a handle (device_uid, specific_device_uid, phase) that can be checked later with C(status).
+            type: bool
+            default: true
+      concurrency:
+        description: >-
+          The maximum number of devices from C(ftd_devices) and C(asa_ios_devices) being onboarded at the same time.
+          The results for every device are returned in C(cdo) with a status of added, duplicate, or failed. The
+          connectivity and credential state of all devices being onboarded is polled together, in one inventory query
+          per poll interval.
+        type: int
+        default: 10
   delete:
     description: >-
       This option removes an FTD, ASA, or IOS device from CDO and cdFMC if
@@ -194,18 +471,96 @@ options:
     type: dict
     options:
       device_name:
-        description: 'The type of device to delete [ASA, IOS, FTD]'
+        description: The name of the device in CDO inventory to delete
         type: str
-        required: true
+      device_names:
+        description: >-
+          Delete many devices in one batched pass: the names are resolved in a few inventory queries, all devices share
+          one working set, all FTDs are removed from the cdFMC with a single delete trigger, and ASA/IOS devices are
+          deleted concurrently. One result per name is returned in C(cdo) with a status of deleted, not_found,
+          too_many_matches, unsupported_type, or failed. Only ASA, IOS, and FTD devices are deleted; the cdFMC never
+          matches a name.
+        type: list
+        elements: str
+      query:
+        description: >-
+          Delete every device matching all of the given criteria. The matches are resolved with paginated inventory
+          queries and deleted in one batched pass (see C(device_names)). Use C(dry_run) to preview them first. The
+          cdFMC is never selected.
+        type: dict
+        options:
+          name:
+            description: A device name or name pattern with * wildcards, e.g. lab-*
+            type: str
+          tags:
+            description: >-
+              Tags the devices must have, as {key: value}. Use the key labels for plain (ungrouped) tags.
+            type: dict
+          device_type:
+            description: Only select devices of this type
+            type: str
+            choices:
+              - asa
+              - ios
+              - ftd
+          connectivity_state:
+            description: Only select devices in this CDO connectivity state, e.g. -1 for unreachable devices
+            type: int
+      dry_run:
+        description: >-
+          With C(query), do not delete anything. Return the matching devices with their total count and counts by
+          device type.
+        type: bool
+        default: false
+      page_size:
+        description: The number of devices to request per page when resolving C(query)
+        type: int
+        default: 50
       device_type:
-        description: The name of the device in CDO inventory to delete
+        description: >-
+          Only match devices of this type [ASA, IOS, FTD] when looking up C(device_name) or C(device_names). How a
+          device is deleted always follows its deviceType in CDO inventory. Not used with C(query), which has its
+          own device_type.
         type: str
-        required: true
         choices:
           - asa
           - ios
           - ftd
-
+      concurrency:
+        description: >-
+          The maximum number of ASA/IOS DELETE calls in flight at once when deleting C(device_names) or C(query)
+          matches
+        type: int
+        default: 10
+  status:
+    description: >-
+      Check on devices onboarded with C(wait=false). All handles are looked up in one batched inventory query (per 50
+      handles). Each handle is returned with its current phase (onboarded, failed, not_found, or still the phase it was
+      handed off in) and done set to true once the phase will not change any more.
+    type: dict
+    options:
+      handles:
+        description: The handles returned in C(cdo) by add with C(wait=false)
+        type: list
+        elements: dict
+        required: true
+        options:
+          device_uid:
+            description: The uid of the CDO device
+            type: str
+            required: true
+          specific_device_uid:
+            description: The uid of the specific device (ASA and FTD)
+            type: str
+          device_name:
+            description: The name of the device
+            type: str
+          device_type:
+            description: The type of device (asa, ios, ftd)
+            type: str
+          phase:
+            description: The onboarding phase the device was handed off in
+            type: str
 """
 
 EXAMPLES = r"""
@@ -264,6 +619,51 @@ EXAMPLES = r"""
             password: "{{ hostvars[inventory_hostname].password }}"
             ignore_cert: "{{ hostvars[inventory_hostname].ignore_cert }}"
 
+- name: Onboard a site's ASAs in one task
+  hosts: localhost
+  connection: local
+  tasks:
+    - name: Add all ASAs concurrently
+      cisco.cdo.device_inventory:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        add:
+          concurrency: 20
+          asa_ios_devices:
+            - device_name: Branch-ASA-1
+              ipv4: 10.1.1.1
+              sdc: CDO_tenant-SDC-1
+              username: "{{ lookup('ansible.builtin.env', 'ASA_USERNAME') }}"
+              password: "{{ lookup('ansible.builtin.env', 'ASA_PASSWORD') }}"
+            - device_name: Branch-ASA-2
+              ipv4: 10.1.2.1
+              sdc: CDO_tenant-SDC-1
+              username: "{{ lookup('ansible.builtin.env', 'ASA_USERNAME') }}"
+              password: "{{ lookup('ansible.builtin.env', 'ASA_PASSWORD') }}"
+
+- name: Onboard ASAs without waiting, then check on them later
+  hosts: localhost
+  connection: local
+  tasks:
+    - name: Hand the ASAs off to CDO
+      cisco.cdo.device_inventory:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        add:
+          asa_ios_devices: "{{ new_asas }}"  # each entry as in asa_ios above, plus wait: false
+      register: onboarding
+
+    - name: Wait until every ASA is onboarded or has failed
+      cisco.cdo.device_inventory:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        status:
+          handles: "{{ onboarding.cdo | selectattr('handle', 'defined') | map(attribute='handle') }}"
+      register: onboarding_status
+      until: onboarding_status.cdo | rejectattr('done') | list | length == 0
+      retries: 30
+      delay: 10
+
 - name: Delete devices from CDO inventory
   hosts: all
   connection: local
@@ -275,17 +675,57 @@ EXAMPLES = r"""
         delete:
           device_name: "{{ inventory_hostname }}"
           device_type: "{{ hostvars[inventory_hostname].device_type }}"
+
+- name: Decommission a site in one task
+  hosts: localhost
+  connection: local
+  tasks:
+    - name: Delete all of the site's devices in one batched pass
+      cisco.cdo.device_inventory:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        delete:
+          device_names: "{{ groups['branch_42'] }}"
+
+- name: Clean up the lab
+  hosts: localhost
+  connection: local
+  tasks:
+    - name: Preview which devices would be removed
+      cisco.cdo.device_inventory:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        delete:
+          query:
+            name: lab-*
+            tags:
+              env: lab
+          dry_run: true
+      register: lab_devices
+
+    - name: Delete them in one batched pass
+      cisco.cdo.device_inventory:
+        api_key: "{{ lookup('ansible.builtin.env', 'CDO_API_KEY') }}"
+        region: "{{ lookup('ansible.builtin.env', 'CDO_REGION') }}"
+        delete:
+          query:
+            name: lab-*
+            tags:
+              env: lab
+      when: lab_devices.cdo.count < 100
 """
 
 # fmt: off
-import json
 from ansible_collections.cisco.cdo.plugins.module_utils.api_requests import CDORegions, CDORequests
 from ansible_collections.cisco.cdo.plugins.module_utils._version import __version__
+from ansible_collections.cisco.cdo.plugins.module_utils.cache import CDOCache
+from ansible_collections.cisco.cdo.plugins.module_utils.polling import CDOBatchPoller
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.ftd import FTDInventory
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.asa import ASA_IOS_Inventory
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.delete import DeleteInventory
+from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.bulk import BulkInventory
 from ansible_collections.cisco.cdo.plugins.module_utils.device_inventory.inventory import Inventory
-from ansible_collections.cisco.cdo.plugins.module_utils.cdo_models import ASA_IOS, FTD, FMC
+from ansible_collections.cisco.cdo.plugins.module_utils.cdo_models import DEVICE_FIELDS, ALL_DEVICE_FIELDS
 from ansible_collections.cisco.cdo.plugins.module_utils.errors import (
     DeviceNotFound,
     AddDeviceFailure,
@@ -296,34 +736,52 @@ from ansible_collections.cisco.cdo.plugins.module_utils.errors import (
     DeviceUnreachable,
     APIError,
     CredentialsFailure,
-    TooManyMatches
+    TooManyMatches,
+    UnsupportedDeviceType,
 )
 from ansible_collections.cisco.cdo.plugins.module_utils.args_common import (
     INVENTORY_ARGUMENT_SPEC,
     INVENTORY_REQUIRED_ONE_OF,
     INVENTORY_MUTUALLY_EXCLUSIVE,
-    INVENTORY_REQUIRED_IF
+    INVENTORY_REQUIRED_IF,
+    INVENTORY_POSITIVE_OPTIONS,
+    check_positive_options,
 )
 from ansible.module_utils.basic import AnsibleModule
 # fmt: on
 
 
-def normalize_device_output(results: list):
+def normalize_device_output(results: list, fields: list = None):
     """From the json data returned from the CDO API, use the models defined in
-    module_utils/cdo_models.py to determine what data we return to the calling playbook"""
+    module_utils/cdo_models.py to determine what data we return to the calling playbook.
+    results may be a single device, a list, or a generator of devices (see Inventory.iter_inventory).
+    If fields is given, only those attributes were resolved by CDO, so return just those"""
     results = [results] if isinstance(results, dict) else results  # we expect a list
     normalized_devices = list()
     if results:
         for device in results:
-            if device.get("deviceType") == "ASA" or device.get("deviceType") == "IOS":
-                normalized_devices.append(ASA_IOS.from_json(json.dumps(device)).to_dict())
-            elif device.get("deviceType") == "FTDC":
-                normalized_devices.append(FTD.from_json(json.dumps(device)).to_dict())
-            elif device.get("deviceType") == "FMCE":
-                normalized_devices.append(FMC.from_json(json.dumps(device)).to_dict())
+            device_fields = DEVICE_FIELDS.get(device.get("deviceType"))
+            if device_fields is not None:
+                normalized_devices.append({field: device.get(field) for field in fields or device_fields})
     return normalized_devices
 
 
+def columnar_device_output(results: list, fields: list = None) -> dict:
+    """Like normalize_device_output, but return the field names once plus one row of values per device. Without
+    explicit fields, the columns not in a device type's model are None, like the keys the list format leaves out.
+    Rows are built straight from the API records"""
+    columns = list(fields or ALL_DEVICE_FIELDS)
+    type_columns = {
+        device_type: [column if fields or column in device_fields else None for column in columns]
+        for device_type, device_fields in DEVICE_FIELDS.items()
+    }
+    rows = list()
+    for device in [results] if isinstance(results, dict) else results:
+        if device.get("deviceType") in type_columns:
+            rows.append([column and device.get(column) for column in type_columns[device.get("deviceType")]])
+    return {"fields": columns, "rows": rows}
+
+
 def main():
     result = dict(
         msg="", stdout="", stdout_lines=[], stderr="", stderr_lines=[], cdo=None, rc=0, failed=False, changed=False
@@ -334,23 +792,43 @@ def main():
         mutually_exclusive=INVENTORY_MUTUALLY_EXCLUSIVE,
         required_if=INVENTORY_REQUIRED_IF,
     )
+    error = check_positive_options(module.params, INVENTORY_POSITIVE_OPTIONS)
+    if error:
+        module.fail_json(msg=error)
     endpoint = CDORegions[module.params.get("region")].value
-    http_session = CDORequests.create_session(module.params.get("api_key"), __version__)
+    http_session = CDORequests.create_session(
+        module.params.get("api_key"), __version__, module._socket_path, module.params.get("api_retry")
+    )
+    cache = CDOCache(module.params.get("api_key"), module.params.get("region"), **module.params.get("cache"))
     # Get inventory from CDO and return a list of dict(s) - Devices and attributes
     if module.params.get("gather"):
         try:
-            inventory_client = Inventory(module.params.get("gather"), http_session, endpoint)
-            result["cdo"] = normalize_device_output(inventory_client.gather_inventory())
+            gather = module.params.get("gather")
+            inventory_client = Inventory(gather, http_session, endpoint, cache)
+            if gather.get("delta"):
+                devices = inventory_client.gather_delta_inventory(gather.get("page_size"), gather.get("delta_marker"))
+                result["delta"] = inventory_client.delta_stats
+            elif cache.enabled or gather.get("workers") > 1:
+                devices = inventory_client.gather_cached_inventory(gather.get("page_size"), gather.get("workers"))
+            else:
+                devices = inventory_client.iter_inventory(gather.get("page_size"))
+            if gather.get("output_format") == "columnar":
+                result["cdo"] = columnar_device_output(devices, gather.get("fields"))
+            else:
+                result["cdo"] = normalize_device_output(devices, gather.get("fields"))
             result["changed"] = False
         except (CredentialsFailure, APIError) as e:
             result["stderr"] = f"ERROR: {e.message}"
     # Add devices to CDO inventory and return a json dictionary of the new device attributes
     if module.params.get("add"):
         if module.params.get("add", {}).get("ftd"):
-            ftd_client = FTDInventory(module.params.get("add", {}).get("ftd"), http_session, endpoint)
+            ftd_client = FTDInventory(module.params.get("add", {}).get("ftd"), http_session, endpoint, cache)
             try:
                 add_result = ftd_client.add_ftd()
-                result["cdo"] = normalize_device_output(add_result)
+                if module.params.get("add", {}).get("ftd", {}).get("wait"):
+                    result["cdo"] = normalize_device_output(add_result)
+                else:
+                    result["cdo"] = add_result
                 result["changed"] = True
             except DuplicateObject as e:
                 result["cdo"] = f"Device Not added: {e.message}"
@@ -360,10 +838,17 @@ def main():
                 result["stderr"] = f"ERROR: {e.message}"
                 result["changed"] = False
                 result["failed"] = True
+            result["timings"] = ftd_client.timings.phases
         if module.params.get("add", {}).get("asa_ios"):
+            asa_ios_client = ASA_IOS_Inventory(
+                module.params.get("add", {}).get("asa_ios"), http_session, endpoint, cache
+            )
             try:
-                asa_ios_client = ASA_IOS_Inventory(module.params.get("add", {}).get("asa_ios"), http_session, endpoint)
-                result["cdo"] = normalize_device_output(asa_ios_client.add_asa_ios())
+                add_result = asa_ios_client.add_asa_ios()
+                if module.params.get("add", {}).get("asa_ios", {}).get("wait"):
+                    result["cdo"] = normalize_device_output(add_result)
+                else:
+                    result["cdo"] = add_result
                 result["changed"] = True
             except DuplicateObject as e:
                 result["cdo"] = f"Device Not added: {e.message}"
@@ -373,18 +858,78 @@ def main():
                 result["stderr"] = f"ERROR: {e.message}"
                 result["changed"] = False
                 result["failed"] = True
-    if module.params.get("delete"):# Delete an ASA, FTD, or IOS device from CDO/cdFMC
+            result["timings"] = asa_ios_client.timings.phases
+        if module.params.get("add", {}).get("ftd_devices") or module.params.get("add", {}).get("asa_ios_devices"):
+            add = module.params.get("add")
+            bulk_client = BulkInventory(add, http_session, endpoint, cache, CDOBatchPoller(http_session, endpoint))
+            try:
+                add_results = bulk_client.add_devices(
+                    add.get("ftd_devices"), add.get("asa_ios_devices"), add.get("concurrency")
+                )
+                for add_result in add_results:
+                    if add_result.get("device"):
+                        add_result["device"] = normalize_device_output(add_result["device"])
+                result["cdo"] = add_results
+                result["changed"] = bulk_client.changed
+                result["failed"] = any(add_result["status"] == "failed" for add_result in add_results)
+            except (CredentialsFailure, APIError) as e:
+                result["stderr"] = f"ERROR: {e.message}"
+                result["changed"] = bulk_client.changed
+                result["failed"] = True
+            result["timings"] = bulk_client.timings.phases
+    if module.params.get("delete"):  # Delete an ASA, FTD, or IOS device from CDO/cdFMC
+        delete_client = DeleteInventory(module.params.get("delete"), http_session, endpoint, cache)
+        if module.params.get("delete").get("query"):  # Delete (or preview) every device matching the query
+            try:
+                result["cdo"] = delete_client.delete_by_query(
+                    module.params.get("delete").get("query"),
+                    module.params.get("delete").get("dry_run"),
+                    module.params.get("delete").get("page_size"),
+                    module.params.get("delete").get("concurrency"),
+                )
+                result["changed"] = delete_client.changed
+                result["failed"] = bool(result["cdo"].get("failed"))
+            except (CredentialsFailure, APIError) as e:
+                result["stderr"] = f"ERROR: {e.message}"
+                result["failed"] = True
+        elif module.params.get("delete").get("device_names"):  # Delete many devices in one batched pass
+            try:
+                result["cdo"] = delete_client.delete_devices(
+                    module.params.get("delete").get("device_names"), module.params.get("delete").get("concurrency")
+                )
+                result["changed"] = delete_client.changed
+                result["failed"] = any(delete_result["status"] == "failed" for delete_result in result["cdo"])
+            except (CredentialsFailure, APIError) as e:
+                result["stderr"] = f"ERROR: {e.message}"
+                result["failed"] = True
+        else:
+            try:
+                delete_client.delete_device()
+                result["changed"] = True
+            except DeviceNotFound as e:
+                result["cdo"] = f"Device Not deleted: {e.message}"
+                result["changed"] = False
+                result["failed"] = False
+            except TooManyMatches as e:
+                result["stderr"] = f"ERROR: {e.message}"
+            except UnsupportedDeviceType as e:
+                result["cdo"] = {
+                    "device_name": module.params.get("delete").get("device_name"),
+                    "status": "unsupported_type",
+                }
+                result["stderr"] = f"ERROR: {e.message}"
+                result["changed"] = False
+                result["failed"] = True
+
+    if module.params.get("status"):  # Check devices onboarded with wait=false
         try:
-            delete_client = DeleteInventory(module.params.get("delete"), http_session, endpoint)
-            delete_client.delete_device()
-            result["changed"] = True
-        except DeviceNotFound as e:
-            result["cdo"] = f"Device Not deleted: {e.message}"
+            inventory_client = Inventory(module.params.get("status"), http_session, endpoint, cache)
+            result["cdo"] = inventory_client.get_onboarding_status(module.params.get("status", {}).get("handles"))
             result["changed"] = False
-            result["failed"] = False
-        except (TooManyMatches) as e:
+        except (CredentialsFailure, APIError) as e:
             result["stderr"] = f"ERROR: {e.message}"
 
+    result["retry_stats"] = http_session.retry_policy.stats()
     module.exit_json(**result)
 
 